@@ -0,0 +1,32 @@
+"""Time solver.solve against solve_parallel on registered worlds.
+
+    python benchmarks/solver_bench.py [world ...]
+"""
+import sys
+
+import gridlab
+from gridlab.parallel_solver import solve_parallel
+from gridlab.solver import SolveResult, solve
+
+WORLDS = ['causeway', 'kite', 'switch-push']
+WORKERS = (1, 2)
+
+
+def report(name: str, label: str, result: SolveResult):
+    length = None if result.actions is None else len(result.actions)
+    print(
+        f'{name:14} {label:12} length {length}, {result.nodes} nodes, '
+        f'{result.seconds:.2f} s, {result.nodes_per_second:.0f} nodes/s',
+        flush=True,
+    )
+
+
+def main(names: list[str]):
+    for name in names:
+        report(name, 'solve', solve(gridlab.create_world(name)))
+        for num_workers in WORKERS:
+            report(name, f'parallel x{num_workers}', solve_parallel(name, num_workers=num_workers))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or WORLDS)
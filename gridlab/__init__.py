@@ -3,10 +3,13 @@ __version__ = "0.1.0"
 from gridlab.action import Action  # noqa: F401
 from gridlab.difficulty import Difficulty, get_difficulty_score  # noqa: F401
 from gridlab.entity import Entity, describe_entity  # noqa: F401
+from gridlab.env import WorldEnv  # noqa: F401
+from gridlab.process_vec_world import ProcessVecWorld  # noqa: F401
 from gridlab.runner import render_rollout, run_stdio  # noqa: F401
+from gridlab.vec_world import VecWorld  # noqa: F401
 from gridlab.verify import display_verification_statuses, verify_all_solutions, verify_solution  # noqa: F401
 from gridlab.view.base import View  # noqa: F401
 from gridlab.view.pipeline import ViewPipeline  # noqa: F401
 from gridlab.view.pipeline_builder import build_view_pipeline  # noqa: F401
-from gridlab.world import World  # noqa: F401
+from gridlab.world import UnsolvableError, World  # noqa: F401
 from gridlab.world_builder import create_world, register_world, world_metadata, world_names  # noqa: F401
@@ -1,6 +1,7 @@
+import functools
 import heapq
 
-from gridlab.utils import grid_distance, grid_neighbors
+from gridlab.utils import grid_distance, grid_neighbor_table, grid_neighbors
 
 
 class PriorityQueue:
@@ -108,3 +109,203 @@ def search(
             return path
 
         path.append(prev)
+
+
+class SearchEngine:
+    """Array-backed equivalent of search for one grid shape.
+
+    Cells are flat indices (y * width + x) into a passability sequence such as PassabilityMap.cells.
+    Costs and parents live in preallocated lists that are reset between searches by raising a base
+    offset, and heap entries are single ints ordered exactly like search's ((score, tie), (x, y)) entries.
+    Neighbor tables and the goal distances along each axis are built once and reused by later searches.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self._cost = [0] * self.size  # self._base + cost for cells reached by the current search
+        self._parent = [0] * self.size
+        self._closed = [0] * self.size  # self._base for cells expanded by the current search
+        self._base = 0
+        self._tables: dict[bool, tuple[list, list]] = {}
+        self._column = [i % width for i in range(self.size)]
+        self._row = [i // width for i in range(self.size)]
+        self._distances_x: dict[int, list[int]] = {}  # goal x -> heap key distance from each column
+        self._distances_y: dict[int, list[int]] = {}  # goal y -> heap key distance from each row
+
+        # Cell with the given rank, where ranks order cells by (x, y) as search's heap does
+        self._cell = [0] * self.size
+        for i in range(self.size):
+            x, y = i % width, i // width
+            self._cell[x * height + y] = i
+
+    def _neighbor_tables(self, diagonal: bool):
+        """Neighbor entries (cell, heap offset, x, y) for each cell, when preferring horizontal or vertical steps.
+
+        The heap offset folds the tie-breaker and the neighbor's rank into one int.
+        """
+        tables = self._tables.get(diagonal)
+        if tables is None:
+            width, height, size = self.width, self.height, self.size
+            prefer_horizontal: list[tuple[tuple[int, int, int, int], ...]] = []
+            prefer_vertical: list[tuple[tuple[int, int, int, int], ...]] = []
+            for i, neighbors in enumerate(grid_neighbor_table(width, height, diagonal)):
+                x, y = i % width, i // width
+                entries_h = []
+                entries_v = []
+                for n in neighbors:
+                    nx, ny = n % width, n // width
+                    rank = nx * height + ny
+                    entries_h.append((n, (0 if nx != x else 1) * size + rank, nx, ny))
+                    entries_v.append((n, (0 if ny != y else 1) * size + rank, nx, ny))
+
+                prefer_horizontal.append(tuple(entries_h))
+                prefer_vertical.append(tuple(entries_v))
+
+            tables = self._tables[diagonal] = (prefer_horizontal, prefer_vertical)
+
+        return tables
+
+    def _distances(self, cache: dict[int, list[int]], goal: int, length: int) -> list[int]:
+        """Distances from goal along one axis, scaled to the heap key's score unit."""
+        distances = cache.get(goal)
+        if distances is None:
+            scale = 2 * self.size
+            distances = cache[goal] = [abs(i - goal) * scale for i in range(length)]
+
+        return distances
+
+    def search(
+        self,
+        cells,
+        start: tuple[int, int],
+        goal: tuple[int, int],
+        diagonal: bool = False,
+        fallback: bool = False,
+    ) -> list[tuple[int, int]] | None:
+        width = self.width
+        size = self.size
+        scale = 2 * size
+        cell = self._cell
+        cost = self._cost
+        parent = self._parent
+        closed = self._closed
+        column = self._column
+        row = self._row
+        table_h, table_v = self._neighbor_tables(diagonal)
+
+        # Costs never exceed size, so everything below the new base belongs to earlier searches
+        self._base += size + 1
+        base = self._base
+
+        gx, gy = goal
+        start_index = start[1] * width + start[0]
+        goal_index = gy * width + gx
+        if start_index == goal_index:
+            return None
+
+        distance_x = self._distances(self._distances_x, gx, width)
+        distance_y = self._distances(self._distances_y, gy, self.height)
+
+        cost[start_index] = base
+        parent[start_index] = -1
+
+        # Track the first discovered cell closest to the goal, as min() over came_from would
+        closest = start_index
+        closest_distance = grid_distance(start, goal, diagonal=diagonal) * scale
+
+        push = heapq.heappush
+        pop = heapq.heappop
+        pushpop = heapq.heappushpop
+        frontier = []
+        pending = start[0] * self.height + start[1]  # last heap key, pushed along with the next pop
+        while True:
+            if pending is not None:
+                current = cell[pushpop(frontier, pending) % size]
+                pending = None
+            elif frontier:
+                current = cell[pop(frontier) % size]
+            else:
+                break
+
+            if current == goal_index:
+                break
+
+            # With a consistent heuristic a cell is first expanded at its optimal cost,
+            # so expanding it again (from a stale heap entry) can never improve a neighbor
+            if closed[current] == base:
+                continue
+
+            closed[current] = base
+            new_cost = cost[current] + 1
+            key = (new_cost - base) * scale
+            if distance_x[column[current]] >= distance_y[row[current]]:
+                entries = table_h[current]
+            else:
+                entries = table_v[current]
+
+            for neighbor, offset, x, y in entries:
+                if not cells[neighbor]:
+                    continue
+
+                neighbor_cost = cost[neighbor]
+                if neighbor_cost >= base and new_cost >= neighbor_cost:
+                    continue
+
+                dx = distance_x[x]
+                dy = distance_y[y]
+                if not diagonal:
+                    distance = dx + dy
+                elif dx >= dy:
+                    distance = dx
+                else:
+                    distance = dy
+
+                if fallback and distance < closest_distance and neighbor_cost < base:
+                    closest = neighbor
+                    closest_distance = distance
+
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                if pending is not None:
+                    push(frontier, pending)
+
+                pending = key + distance + offset
+
+        if cost[goal_index] < base:
+            if not fallback:
+                return None
+
+            if closest == start_index:
+                return None  # no moves
+
+            goal_index = closest
+
+        path: list[tuple[int, int]] = [(goal_index % width, goal_index // width)]
+        prev = parent[goal_index]
+        while prev != start_index:
+            path.append((prev % width, prev // width))
+            prev = parent[prev]
+
+        path.reverse()
+        return path
+
+
+@functools.cache
+def get_search_engine(width: int, height: int) -> SearchEngine:
+    return SearchEngine(width, height)
+
+
+def search_cells(
+    cells,
+    width: int,
+    height: int,
+    start: tuple[int, int],
+    goal: tuple[int, int],
+    diagonal: bool = False,
+    fallback: bool = False,
+) -> list[tuple[int, int]] | None:
+    """Same as search, for a flat passability sequence indexed as cells[y * width + x]."""
+    engine = get_search_engine(width, height)
+    return engine.search(cells, start, goal, diagonal=diagonal, fallback=fallback)
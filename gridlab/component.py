@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 from gridlab.entity import Entity
+from gridlab.pathfinding import Pathfinding
 from gridlab.utils import grid_neighbors
 
 
@@ -123,6 +124,7 @@ class ChaseAI:
     stagger: int = 1
     tick: int = 0
     diagonal: bool = False
+    pathfinding: Pathfinding = Pathfinding.A_STAR
 
 
 @dataclass
@@ -164,6 +166,7 @@ class SnakeAI:
     steps: int = 1
     diagonal: bool = False
     delta: tuple[int, int] | None = None
+    pathfinding: Pathfinding = Pathfinding.A_STAR
 
 
 @dataclass
@@ -181,3 +184,10 @@ class Timer:
 class TimerReset:
     """Reset the game timer."""
     pass
+
+
+# Components that systems update in place, which a forked world needs its own copies of
+MUTABLE_COMPONENTS = (ChaseAI, FixedAI, KeyCollector, PatrolAI, SnakeAI, Switch, Timer)
+
+# Components of entities that can move, disappear or stop blocking, so are never permanent walls
+CHANGING_COMPONENTS = (Pushable, PatrolAI, ChaseAI, FixedAI, MirrorAI, SnakeAI, Switchable, Door, Timer)
@@ -0,0 +1,105 @@
+from gridlab.component import CHANGING_COMPONENTS, Active, Key, Position, Pushable, Solid, TimerReset
+from gridlab.solver import goal_distances
+from gridlab.world import World
+
+# Blocks holding any of these can also be switched off, expire or be picked up, so never freeze
+_UNSTABLE = tuple(t for t in CHANGING_COMPONENTS if t is not Pushable) + (Key, TimerReset)
+
+
+class DeadlockDetector:
+    """Finds states where pushed blocks have frozen so that the player can no longer reach a goal.
+
+    A block is frozen if it can never be pushed again. Along each axis, the blocks in line with
+    it move together when pushed (the player pushes chains), so that run of blocks is stuck when
+    a wall is at either of its ends. Blocks stuck along both axes, given that the other frozen
+    blocks never move, are frozen and act as walls from then on. Walls are the solids that can
+    never move, disappear or let anything through; the grid edge counts as one.
+
+    Cells where a block is stuck by walls alone (corners) are precomputed in `dead_squares`. The
+    goal distances around each set of frozen blocks are cached, so checking a state costs a pass
+    over its blocks. Blocks that can also change in other ways (switchable, timed or removable
+    ones) are never frozen. A detector only depends on the walls and goals, so it can be shared
+    by the forks of the world it was built from.
+    """
+
+    def __init__(self, world: World):
+        em = world.em
+        self.width, self.height = world.grid.width, world.grid.height
+        position_map = em.get(Position)
+        solid_map = em.get(Solid)
+
+        self.walls = [False] * (self.width * self.height)
+        for ent in em.query(Solid, Position):
+            if solid_map[ent].allow is None and not any(ent in em.get(c) for c in CHANGING_COMPONENTS):
+                p = position_map[ent]
+                self.walls[p.y * self.width + p.x] = True
+
+        self.dead_squares = [
+            not self._is_wall(x, y)
+            and (self._is_wall(x - 1, y) or self._is_wall(x + 1, y))
+            and (self._is_wall(x, y - 1) or self._is_wall(x, y + 1))
+            for y in range(self.height)
+            for x in range(self.width)
+        ]
+        self._distances: dict[frozenset[int], list[int | None] | None] = {frozenset(): goal_distances(world)}
+
+    def _is_wall(self, x: int, y: int) -> bool:
+        return not (0 <= x < self.width and 0 <= y < self.height) or self.walls[y * self.width + x]
+
+    def _is_stuck(self, x: int, y: int, dx: int, dy: int, frozen: set[int]) -> bool:
+        """Whether the run of frozen blocks through (x, y) along (dx, dy) has a wall at either end."""
+        for sign in (1, -1):
+            nx, ny = x + dx * sign, y + dy * sign
+            while 0 <= nx < self.width and 0 <= ny < self.height and ny * self.width + nx in frozen:
+                nx, ny = nx + dx * sign, ny + dy * sign
+
+            if self._is_wall(nx, ny):
+                return True
+
+        return False
+
+    def frozen_blocks(self, world: World) -> frozenset[int]:
+        """Cells (indexed y * width + x) of the blocks that can never be pushed again."""
+        em = world.em
+        position_map = em.get(Position)
+        width = self.width
+        unstable = [em.get(t) for t in _UNSTABLE]
+        frozen = {
+            position_map[ent].y * width + position_map[ent].x
+            for ent in em.query(Pushable, Solid, Active, Position)
+            if not any(ent in component_map for component_map in unstable)
+        }
+
+        # Start from every block and drop those that could move until the rest hold each other
+        changed = True
+        while changed:
+            changed = False
+            for i in list(frozen):
+                if self.dead_squares[i]:
+                    continue
+
+                x, y = i % width, i // width
+                if not (self._is_stuck(x, y, 1, 0, frozen) and self._is_stuck(x, y, 0, 1, frozen)):
+                    frozen.remove(i)
+                    changed = True
+
+        return frozenset(frozen)
+
+    def goal_distance(self, world: World) -> int | None:
+        """Steps the player needs at least to reach a goal around walls and frozen blocks, or None if none can be reached.
+
+        Returns 0 when goals could move, as nothing is known then.
+        """
+        if self._distances[frozenset()] is None:
+            return 0
+
+        frozen = self.frozen_blocks(world)
+        distances = self._distances.get(frozen)
+        if distances is None:
+            distances = self._distances[frozen] = goal_distances(world, frozen)
+
+        p = world.em.get(Position)[world.player]
+        return distances[p.y * self.width + p.x]
+
+    def is_deadlocked(self, world: World) -> bool:
+        return self.goal_distance(world) is None
@@ -1,7 +1,8 @@
 import dataclasses
-import itertools
+import copy
+import heapq
 from enum import StrEnum
-from typing import Type, TypeVar
+from typing import Any, Callable, Container, Iterable, KeysView, Type, TypeVar
 
 
 class Entity(StrEnum):
@@ -52,37 +53,326 @@ def describe_entity(entity: Entity):
     return ENTITY_DESCRIPTION[entity]
 
 
+# Small int code of each entity type, shared by observations, array storage and the state codec
+ENTITY_TYPES = list(Entity)
+ENTITY_CODES = {e: i for i, e in enumerate(ENTITY_TYPES)}
+
+
 C = TypeVar('C')
 
 
+@dataclasses.dataclass(frozen=True)
+class EntityHandle:
+    """Reference to an entity that can tell when the entity has been removed and its id reused."""
+    ent: int
+    generation: int
+
+
 class EntityManager:
-    def __init__(self):
-        self._next_ent = itertools.count()
+    """Creates entities and stores their components.
+
+    By default ids increase monotonically and are never reused. With `recycle_ids` the ids of
+    removed entities are handed out again (lowest first) to keep the id space compact; use
+    `handle`/`resolve` to hold references that detect reuse.
+    """
+
+    def __init__(self, recycle_ids: bool = False):
+        from gridlab.component import Position  # deferred, gridlab.component imports this module
+
+        self.recycle_ids = recycle_ids
+        self._position_type = Position  # the component type kept in _position_index
+        self._next_ent = 0
+        self._generations: dict[int, int] = self._new_map()  # map entity_id -> generation, bumped on removal
+        self._alive: dict[int, None] = self._new_map()
+        self._free: list[int] = []  # heap of removed ids available for reuse
         self._components = {}  # map component -> {entity_id: component}
+        self._position_index: dict[tuple[int, int], frozenset[int]] = self._new_map()  # map (x, y) -> {entity_id}
+        self._entity_components: dict[int, tuple[type, ...]] = self._new_map()  # map entity_id -> components
+        self._archetypes: dict[frozenset[type], dict[int, None]] = {}  # map components -> {entity_id: None}, by id
+        self._archetype_keys: dict[type, frozenset[frozenset[type]]] = {}  # map component -> archetypes cached with it
+        self._journal: list[tuple] | None = None  # changes recorded for rollback, oldest first
+
+        # Invoked as callback(ent, component_type, old, new) after a component is added, replaced or removed
+        self.component_callbacks: list[Callable[[int, type, Any, Any], None]] = []
 
     def create(self):
-        return next(self._next_ent)
+        recycled = bool(self._free)
+        if recycled:
+            ent = heapq.heappop(self._free)
+        else:
+            ent = self._next_ent
+            self._next_ent += 1
+            self._generations[ent] = 0
+
+        self._alive[ent] = None
+        if self._journal is not None:
+            self._journal.append(('create', ent, recycled))
+
+        return ent
+
+    def handle(self, ent: int) -> EntityHandle:
+        return EntityHandle(ent, self._generations[ent])
+
+    def resolve(self, handle: EntityHandle) -> int | None:
+        """Return the handle's entity id, or None if the entity has since been removed."""
+        if handle.ent in self._alive and self._generations[handle.ent] == handle.generation:
+            return handle.ent
+
+        return None
+
+    def is_alive(self, ent: int) -> bool:
+        return ent in self._alive
+
+    def _new_map(self) -> dict:
+        """Return an empty map for storing components and bookkeeping, a dict unless overridden."""
+        return {}
 
     def get(self, cls: Type[C]) -> dict[int, C]:
         return self._components.get(cls, {})
 
+    def component_types(self) -> KeysView[type]:
+        """Live view of the component types added so far, kept even once no entity holds them."""
+        return self._components.keys()
+
+    def query(self, *component_types: type, active: bool = False) -> KeysView[int]:
+        """Return the entities holding every component in `component_types`, ordered by id.
+
+        If `active` is True only entities holding the Active component are returned.
+        Results are cached until an entity gains or loses one of the queried components.
+        """
+        if active:
+            from gridlab.component import Active  # deferred, gridlab.component imports this module
+            component_types = (*component_types, Active)
+
+        key = frozenset(component_types)
+        if not key:
+            raise ValueError('query requires at least one component type')
+
+        members = self._archetypes.get(key)
+        if members is None:
+            component_maps = sorted((self.get(c) for c in key), key=len)
+            smallest, *rest = component_maps
+            entities = [e for e in smallest if all(e in m for m in rest)]
+            members = self._archetypes[key] = dict.fromkeys(sorted(entities))
+            for c in key:
+                self._archetype_keys[c] = self._archetype_keys.get(c, frozenset()) | {key}
+
+        return members.keys()
+
+    def _invalidate_archetypes(self, component_type: type):
+        # Keys already dropped through another of their types are skipped
+        for key in self._archetype_keys.pop(component_type):
+            self._archetypes.pop(key, None)
+
+    def at(
+            self,
+            x: int,
+            y: int,
+            with_: type | None = None,
+            active: bool = False,
+    ) -> list[int]:
+        """Return the entities positioned at (x, y), ordered by id.
+
+        If `with_` is given only entities holding that component are returned.
+        If `active` is True only entities holding the Active component are returned.
+        """
+        entities = self._position_index.get((x, y))
+        if not entities:
+            return []
+
+        component_types = () if with_ is None else (with_,)
+        if not component_types and not active:
+            return sorted(entities)
+
+        members = self.query(*component_types, active=active)
+        return sorted(e for e in entities if e in members)
+
+    def _index_position(self, ent: int, old, new):
+        # Cells hold frozensets, replaced rather than updated so forks can share them
+        if old is not None:
+            cell = self._position_index[old.x, old.y] - {ent}
+            if cell:
+                self._position_index[old.x, old.y] = cell
+            else:
+                del self._position_index[old.x, old.y]
+
+        if new is not None:
+            self._position_index[new.x, new.y] = self._position_index.get((new.x, new.y), frozenset()) | {ent}
+
     def remove(self, ent: int):
-        for component_map in self._components.values():
-            component_map.pop(ent, None)
+        for component_type in self._entity_components.pop(ent, ()):
+            component = self._components[component_type].pop(ent)
+            if component_type is self._position_type:
+                self._index_position(ent, component, None)
+
+            if component_type in self._archetype_keys:
+                self._invalidate_archetypes(component_type)
+            if self._journal is not None:
+                self._journal.append(('component', ent, component_type, component))
 
-    def remove_all(self, entities: list[int]):
-        entities = list(entities)
-        for ent in entities:
+            for callback in self.component_callbacks:
+                callback(ent, component_type, component, None)
+
+        if ent in self._alive:
+            del self._alive[ent]
+            self._generations[ent] += 1
+            if self.recycle_ids:
+                heapq.heappush(self._free, ent)
+
+            if self._journal is not None:
+                self._journal.append(('remove', ent))
+
+    def remove_all(self, entities: Iterable[int]):
+        for ent in dict.fromkeys(entities):
             self.remove(ent)
 
+    def remove_where(self, component_type: Type[C], predicate: Callable[[C], bool] | None = None) -> list[int]:
+        """Remove every entity holding `component_type` (and satisfying `predicate` if given).
+
+        Returns the removed entities.
+        """
+        component_map = self.get(component_type)
+        if predicate is None:
+            entities = list(component_map)
+        else:
+            entities = [e for e, c in component_map.items() if predicate(c)]
+
+        self.remove_all(entities)
+        return entities
+
     def add_component(self, ent: int, component):
-        self._components.setdefault(type(component), {})[ent] = component
+        component_type = type(component)
+        component_map = self._components.get(component_type)
+        if component_map is None:
+            component_map = self._components[component_type] = self._new_map()
+
+        old = component_map.get(ent)
+        if component_type is self._position_type:
+            self._index_position(ent, old, component)
+
+        component_map[ent] = component
+        if old is None:
+            self._entity_components[ent] = self._entity_components.get(ent, ()) + (component_type,)
+            if component_type in self._archetype_keys:  # no cached query holds it while a world is built
+                self._invalidate_archetypes(component_type)
+
+        if self._journal is not None:
+            self._journal.append(('component', ent, component_type, old))
+
+        for callback in self.component_callbacks:
+            callback(ent, component_type, old, component)
 
     def remove_component(self, ent: int, component):
         if not isinstance(component, type):
             component = type(component)
 
-        self._components[component].pop(ent)
+        removed = self._components[component].pop(ent)
+        self._entity_components[ent] = tuple(c for c in self._entity_components[ent] if c is not component)
+        if component is self._position_type:
+            self._index_position(ent, removed, None)
+
+        if component in self._archetype_keys:
+            self._invalidate_archetypes(component)
+        if self._journal is not None:
+            self._journal.append(('component', ent, component, removed))
+
+        for callback in self.component_callbacks:
+            callback(ent, component, removed, None)
+
+    def start_journal(self):
+        """Record every change from now on so it can be reverted with `rollback`."""
+        if self._journal is None:
+            self._journal = []
+
+    def stop_journal(self):
+        self._journal = None
+
+    @property
+    def journaling(self) -> bool:
+        """Whether changes are being recorded (start_journal was called and stop_journal not since)."""
+        return self._journal is not None
+
+    def journal_mark(self) -> int:
+        """Position in the journal to later pass to `rollback`."""
+        if self._journal is None:
+            raise ValueError('journal not started!')
+
+        return len(self._journal)
+
+    def journal_since(self, mark: int) -> list[tuple]:
+        """Changes recorded since `mark`, oldest first, each holding the value it replaced.
+
+        Entries are ('create', ent, recycled), ('remove', ent) and ('component', ent, component_type, old),
+        where old is None for a component that was added.
+        """
+        if self._journal is None:
+            raise ValueError('journal not started!')
+
+        return self._journal[mark:]
+
+    def rollback(self, mark: int):
+        """Revert the changes recorded since `mark`, most recent first.
+
+        Components are restored through add_component/remove_component, so callbacks see the
+        reverted changes. Dict order of restored components may differ from before they were removed.
+        """
+        journal = self._journal
+        if journal is None:
+            raise ValueError('journal not started!')
+
+        self._journal = None  # the reverts themselves are not recorded
+        try:
+            while len(journal) > mark:
+                kind, ent, *change = journal.pop()
+                if kind == 'component':
+                    component_type, old = change
+                    if old is None:
+                        self.remove_component(ent, component_type)
+                    else:
+                        self.add_component(ent, old)
+
+                elif kind == 'create':
+                    recycled, = change
+                    del self._alive[ent]
+                    if recycled:
+                        heapq.heappush(self._free, ent)
+                    else:
+                        del self._generations[ent]
+                        self._next_ent -= 1
+
+                elif kind == 'remove':
+                    self._alive[ent] = None
+                    self._generations[ent] -= 1
+                    if self.recycle_ids:
+                        self._free.remove(ent)
+                        heapq.heapify(self._free)
+        finally:
+            self._journal = journal
+
+    def fork(self, copy_types: Container[type] = ()):
+        """Return an independent manager holding the same entities and components.
+
+        Component instances are shared between the two managers, apart from those whose type is in
+        `copy_types` (components that are updated in place), which are copied. Callbacks are not carried over.
+        """
+        em = copy.copy(self)
+        em._generations = self._generations.copy()
+        em._alive = self._alive.copy()
+        em._free = self._free.copy()
+        em._components = {}
+        for component_type, component_map in self._components.items():
+            em._components[component_type] = component_map.copy()
+            if component_type in copy_types:
+                for e, c in component_map.items():
+                    em._components[component_type][e] = copy.copy(c)
+
+        em._position_index = self._position_index.copy()  # cells and component tuples are never updated in place
+        em._entity_components = self._entity_components.copy()
+        em._archetypes = self._archetypes.copy()  # cached member dicts are replaced, never updated
+        em._archetype_keys = self._archetype_keys.copy()
+        em.component_callbacks = []
+        em._journal = None if self._journal is None else []
+        return em
 
     def get_frozen_state(self):
         data = []
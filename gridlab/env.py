@@ -0,0 +1,136 @@
+import functools
+from typing import Any, Callable
+
+from gridlab.action import Action
+from gridlab.component import Active, Identity, Position
+from gridlab.entity import Entity
+from gridlab.state import State
+from gridlab.view.grid import ENTITY_CODES
+from gridlab.world import World
+from gridlab.world_builder import create_world
+
+NUMPY_AVAILABLE = True
+try:
+    import numpy as np
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_MISSING_NUMPY = 'WorldEnv requires the numpy package (pip install numpy)'
+
+ACTIONS = list(Action)
+GOAL_REWARD = 1.0
+DEATH_REWARD = -1.0
+_TRACKED = (Identity, Position, Active)
+
+
+def get_reward(state: State) -> float:
+    if state.goal_reached:
+        return GOAL_REWARD
+
+    if state.player_dead:
+        return DEATH_REWARD
+
+    return 0.0
+
+
+class WorldEnv:
+    """Gym-style environment around a World, with one-hot observations.
+
+    The observation has shape (len(Entity), height, width) and is 1 where an active entity of that
+    type (channel ENTITY_CODES[type]) is positioned. It is kept up to date from the entity manager's
+    component callbacks, so a step only touches the cells that changed. The same array is returned by
+    every call and updated in place; copy it to keep an observation past the next step.
+    """
+
+    def __init__(
+            self,
+            world: str | Callable[[], World],
+            *,
+            max_steps: int | None = None,
+            dtype: str = 'uint8',
+    ):
+        if not NUMPY_AVAILABLE:
+            raise ValueError(_MISSING_NUMPY)
+
+        self._factory = functools.partial(create_world, world) if isinstance(world, str) else world
+        self.max_steps = max_steps
+        self.world = self._factory()
+        self.observation_shape = (len(Entity), self.world.grid.height, self.world.grid.width)
+        self._observation = np.zeros(self.observation_shape, dtype=dtype)
+        self._counts = np.zeros(self.observation_shape, dtype=np.int32)
+        self._cells: dict[int, tuple[int, int, int]] = {}  # cell each entity is counted on
+        self._steps = 0
+        self._attach()
+
+    @property
+    def observation(self) -> 'np.ndarray':
+        return self._observation
+
+    def reset(self) -> tuple['np.ndarray', dict[str, Any]]:
+        self.world.em.component_callbacks.remove(self.on_component_changed)
+        self.world = self._factory()
+        self._steps = 0
+        self._attach()
+        return self._observation, self._info()
+
+    def step(self, action: Action | str | int) -> tuple['np.ndarray', float, bool, bool, dict[str, Any]]:
+        """Return (observation, reward, terminated, truncated, info) after the player takes action."""
+        if self.world.state.is_finished:
+            raise ValueError('episode has terminated, call reset')
+
+        if not isinstance(action, str):
+            action = ACTIONS[action]
+
+        self.world.step(action=Action(action))
+        self._steps += 1
+        state = self.world.state
+        terminated = state.is_finished
+        truncated = not terminated and self.max_steps is not None and self._steps >= self.max_steps
+        return self._observation, get_reward(state), terminated, truncated, self._info()
+
+    def _info(self) -> dict[str, Any]:
+        state = self.world.state
+        return {'turn': self.world.turn, 'goal_reached': state.goal_reached, 'player_dead': state.player_dead}
+
+    def _attach(self):
+        self._observation.fill(0)
+        self._counts.fill(0)
+        self._cells.clear()
+        em = self.world.em
+        for ent in em.query(*_TRACKED):
+            self._update(ent, em.get(Identity)[ent], em.get(Position)[ent], em.get(Active)[ent])
+
+        self.world.em.component_callbacks.append(self.on_component_changed)
+
+    def _update(self, ent: int, identity: Identity | None, position: Position | None, active: Active | None):
+        old = self._cells.pop(ent, None)
+        new = None
+        if identity is not None and position is not None and active is not None:
+            new = ENTITY_CODES[identity.type], position.y, position.x
+
+        if old == new:
+            if new is not None:
+                self._cells[ent] = new
+
+            return
+
+        if old is not None:
+            self._counts[old] -= 1
+            if not self._counts[old]:
+                self._observation[old] = 0
+
+        if new is not None:
+            self._cells[ent] = new
+            self._counts[new] += 1
+            self._observation[new] = 1
+
+    def on_component_changed(self, ent: int, component_type: type, old, new):
+        if component_type in _TRACKED:
+            # The changed component is `new` (None when removed), the others are looked up as they are
+            em = self.world.em
+            self._update(
+                ent,
+                new if component_type is Identity else em.get(Identity).get(ent),
+                new if component_type is Position else em.get(Position).get(ent),
+                new if component_type is Active else em.get(Active).get(ent),
+            )
@@ -0,0 +1,362 @@
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Iterable, Iterator
+
+from gridlab.action import Action
+from gridlab.component import Goal
+from gridlab.deadlock import DeadlockDetector
+from gridlab.solver import ACTIONS, SolveResult, fingerprint
+from gridlab.world import World
+
+_KEY = struct.Struct('>Q')  # big-endian, so records sort by fingerprint when compared as bytes
+_LINK = struct.Struct('>QB')  # parent fingerprint, action index
+
+
+def _records(path: str, size: int, start: int = 0) -> Iterator[bytes]:
+    if os.path.getsize(path) <= start * size:
+        return
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(start * size, len(mm), size):
+            yield mm[i:i + size]
+
+
+def _bisect(mm: mmap.mmap, size: int, key: bytes) -> bytes | None:
+    """Binary search a sorted record map for the record starting with key."""
+    lo, hi = 0, len(mm) // size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mm[mid * size:mid * size + len(key)] < key:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    record = mm[lo * size:(lo + 1) * size]
+    return record if record[:len(key)] == key else None
+
+
+def _find(path: str, size: int, key: bytes) -> bytes | None:
+    if not os.path.getsize(path):
+        return None
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _bisect(mm, size, key)
+
+
+def _write(path: str, records: Iterable[bytes]) -> int:
+    count = 0
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(record)
+            count += 1
+
+    return count
+
+
+def _unseen(records: Iterable[bytes], seen: Iterable[bytes]) -> Iterator[bytes]:
+    """Records, sorted by key, whose key is not in the sorted keys `seen`, reading both once in step."""
+    seen = iter(seen)
+    last = next(seen, None)
+    for record in records:
+        key = record[:_KEY.size]
+        while last is not None and last < key:
+            last = next(seen, None)
+
+        if key != last:
+            yield record
+
+
+class _ExternalSearch:
+    """Best-first search keeping its open and visited states in sorted record files, as External A* does.
+
+    States are grouped in buckets by steps taken and goal distance (see DeadlockDetector, or 0 for
+    every state without pruning, which makes this a breadth-first search). Buckets are expanded by
+    lowest steps plus distance, then most steps, as solver.solve orders its states, so with a
+    consistent distance the first goal found is reached in the fewest steps. Like solver.solve,
+    a bucket is left as soon as one of its successors lands in the next bucket with the same
+    total, and picked up again where it stopped once that one is done.
+
+    Successors are buffered in memory until `buffer_size` records, then sorted and spilled as runs
+    of their bucket. When a bucket comes up, its runs are merged, duplicates dropped and the
+    states already visited removed (delayed duplicate detection). Visited states are kept in
+    memory up to `buffer_size` records too, then written out sorted to trace paths back, and
+    their keys added as a sorted run of visited keys. A state's goal distance depends on the state
+    alone, so visited runs are kept per distance and a bucket is only checked against the runs of
+    its own, read in step with its sorted records. Runs of similar length are merged as they are
+    added, so there are few of them and each key is rewritten a logarithmic number of times.
+    Memory is so bounded by the buffers whatever the number of states.
+    """
+
+    def __init__(self, world: World, directory: str, prune: bool, buffer_size: int):
+        self.root = world.fork()
+        self.root.enable_undo()
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.record_size = _KEY.size + self.root.state_codec.size + _LINK.size
+        self.deadlocks = DeadlockDetector(world) if prune else None
+        self.layer_sizes: list[int] = []  # new states found at each number of steps
+        self.goal: tuple[bytes, int, int] | None = None  # parent key, action index and parent steps of a goal found
+        self.truncated = False  # states were left unexpanded at max_depth
+        self.nodes = 0
+        self._files = itertools.count()
+        self._buffers: dict[tuple[int, int], list[bytes]] = {}  # (steps, distance) -> records in memory
+        self._buffered = 0
+        self._runs: dict[tuple[int, int], list[str]] = {}  # (steps, distance) -> spilled runs
+        self._open: dict[tuple[int, int], list[tuple[list[bytes] | str, int]]] = {}  # merged records or file, next one
+        self._recent: dict[int, dict[bytes, bytes]] = {}  # distance -> key -> record, visited since the last flush
+        self._recent_count = 0
+        self._closed: list[str] = []  # sorted record files of the states visited before
+        self._visited: dict[int, list[tuple[str, int]]] = {}  # distance -> sorted key runs and their lengths
+
+        distance = self._distance(self.root)
+        if distance is not None:
+            self._add(0, distance, _KEY.pack(fingerprint(self.root)) + self.root.encode() + _LINK.pack(0, 0))
+
+    def _new_path(self, kind: str) -> str:
+        return os.path.join(self.directory, f'{kind}-{next(self._files)}.bin')
+
+    def _distance(self, node: World) -> int | None:
+        return 0 if self.deadlocks is None else self.deadlocks.goal_distance(node)
+
+    def _add(self, depth: int, distance: int, record: bytes):
+        self._buffers.setdefault((depth, distance), []).append(record)
+        self._buffered += 1
+        if self._buffered >= self.buffer_size:
+            for bucket, buffer in self._buffers.items():
+                path = self._new_path('run')
+                buffer.sort()
+                _write(path, buffer)
+                self._runs.setdefault(bucket, []).append(path)
+
+            self._buffers.clear()
+            self._buffered = 0
+
+    def next_bucket(self) -> tuple[int, int] | None:
+        """Steps and goal distance of the bucket to expand next, or None once every state was expanded."""
+        buckets = {*self._buffers, *self._runs, *self._open}
+        return min(buckets, key=lambda bucket: (bucket[0] + bucket[1], -bucket[0])) if buckets else None
+
+    def expand(self, stop_at_goal: bool, max_depth: int | float, max_nodes: int | float) -> bool:
+        """Expand the next bucket until a better one turns up, returning False if stopped by a goal or max_nodes.
+
+        The bucket's new states are counted in layer_sizes, but only expanded below max_depth.
+        """
+        depth, distance = bucket = self.next_bucket()
+        sources = self._open.pop(bucket, [])
+        if bucket in self._buffers or bucket in self._runs:
+            sources.append((self._merge(bucket), 0))
+
+        size = self.record_size
+        if depth >= max_depth:
+            self.truncated = self.truncated or any(
+                len(source) > start if isinstance(source, list) else os.path.getsize(source) > start * size
+                for source, start in sources
+            )
+            return True
+
+        key_size = _KEY.size
+        state_end = size - _LINK.size
+        deeper = depth + 1, distance - 1  # same total, so it comes first once it holds states
+        while sources:
+            source, start = sources[0]
+            records = source[start:] if isinstance(source, list) else _records(source, size, start)
+            for index, record in enumerate(records, start):
+                if self.nodes >= max_nodes:
+                    return False
+
+                self.nodes += 1
+                key = record[:key_size]
+                node = self.root.fork()
+                node.decode(record[key_size:state_end])
+                for i, action in enumerate(ACTIONS):
+                    node.step(action=action)
+                    if node.state.goal_reached:
+                        if self.goal is None:
+                            self.goal = key, i, depth
+
+                        if stop_at_goal:
+                            return False
+                    elif not node.state.player_dead:
+                        child_distance = self._distance(node)
+                        if child_distance is not None:
+                            self._add(depth + 1, child_distance, _KEY.pack(fingerprint(node)) + node.encode() + key + bytes((i,)))
+
+                    node.undo()
+
+                if deeper in self._buffers or deeper in self._runs:
+                    sources[0] = source, index + 1
+                    self._open[bucket] = sources
+                    return True
+
+            sources.pop(0)
+
+        return True
+
+    def _merge(self, bucket: tuple[int, int]) -> list[bytes] | str:
+        """Merge a bucket's runs and buffered records, dropping duplicates and visited states.
+
+        Returns the records, or the file they were written to if the bucket had runs on disk.
+        """
+        key_size = _KEY.size
+        size = self.record_size
+        depth, distance = bucket
+        runs = self._runs.pop(bucket, [])
+        buffer = sorted(self._buffers.pop(bucket, []))
+        self._buffered -= len(buffer)
+        recent = self._recent.setdefault(distance, {})
+
+        def unvisited() -> Iterator[bytes]:
+            last = None
+            for record in heapq.merge(buffer, *(_records(path, size) for path in runs)):
+                key = record[:key_size]
+                if key != last and key not in recent:
+                    yield record
+
+                last = key
+
+        if runs:
+            source = self._new_path('bucket')
+            keys = self._new_path('visited')
+            count = 0
+            with open(source, 'wb') as records_file, open(keys, 'wb') as keys_file:
+                for record in _unseen(unvisited(), self._visited_keys(distance)):
+                    records_file.write(record)
+                    keys_file.write(record[:key_size])
+                    count += 1
+
+            for run in runs:
+                os.remove(run)
+
+            self._closed.append(source)
+            self._add_visited(distance, keys, count)
+        else:
+            source = list(_unseen(unvisited(), self._visited_keys(distance)))
+            count = len(source)
+            recent.update((record[:key_size], record) for record in source)
+            self._recent_count += count
+            if self._recent_count >= self.buffer_size:
+                self._flush()
+
+        while len(self.layer_sizes) <= depth:
+            self.layer_sizes.append(0)
+
+        self.layer_sizes[depth] += count
+        return source
+
+    def _flush(self):
+        """Write the recently visited records out, along with the ones still to expand."""
+        key_size = _KEY.size
+        for distance, recent in self._recent.items():
+            if recent:
+                records = sorted(recent.values())
+                path = self._new_path('closed')
+                _write(path, records)
+                self._closed.append(path)
+                keys = self._new_path('visited')
+                self._add_visited(distance, keys, _write(keys, (record[:key_size] for record in records)))
+
+        self._recent.clear()
+        self._recent_count = 0
+
+        for sources in self._open.values():
+            for i, (source, start) in enumerate(sources):
+                if isinstance(source, list):
+                    path = self._new_path('bucket')
+                    _write(path, source[start:])
+                    sources[i] = path, 0
+
+    def _visited_keys(self, distance: int) -> Iterator[bytes]:
+        """Sorted keys of the states written out as visited at `distance`."""
+        return heapq.merge(*(_records(path, _KEY.size) for path, _ in self._visited.get(distance, ())))
+
+    def _add_visited(self, distance: int, path: str, count: int):
+        """Add a sorted run of visited keys, merging it with the runs before it while they are not much longer."""
+        if not count:
+            os.remove(path)
+            return
+
+        runs = self._visited.setdefault(distance, [])
+        runs.append((path, count))
+        while len(runs) > 1 and runs[-2][1] <= 2 * runs[-1][1]:
+            (first, first_count), (second, second_count) = runs[-2:]
+            merged = self._new_path('visited')
+            _write(merged, heapq.merge(_records(first, _KEY.size), _records(second, _KEY.size)))
+            os.remove(first)
+            os.remove(second)
+            runs[-2:] = [(merged, first_count + second_count)]  # a state is visited once, so runs never overlap
+
+    def path(self) -> list[Action]:
+        """Actions reaching the goal found, traced back through the parents in the visited records."""
+        key, action, depth = self.goal
+        actions = [ACTIONS[action]]
+        for _ in range(depth):
+            record = next((recent[key] for recent in self._recent.values() if key in recent), None)
+            if record is None:
+                record = next(r for r in (_find(path, self.record_size, key) for path in self._closed) if r is not None)
+
+            parent, action = _LINK.unpack_from(record, self.record_size - _LINK.size)
+            key = _KEY.pack(parent)
+            actions.append(ACTIONS[action])
+
+        return actions[::-1]
+
+
+def solve_external(
+        world: World,
+        *,
+        scratch_dir: str | None = None,
+        max_depth: int = 200,
+        max_nodes: int = 1_000_000,
+        buffer_size: int = 1 << 16,
+) -> SolveResult:
+    """A* search for a shortest solution keeping the open and visited states on disk rather than in memory.
+
+    States are ordered and pruned by the goal distance around walls and frozen blocks, as in
+    solver.solve. They are stored as fixed-width records in files under a temporary directory
+    created in `scratch_dir` (the system default if None) and removed afterwards; `buffer_size`
+    is the number of successor records held in memory before they are sorted and written out.
+    """
+    started = time.perf_counter()
+    if not world.em.get(Goal):
+        return SolveResult(None, True, 0, time.perf_counter() - started)
+
+    if world.state.goal_reached:
+        return SolveResult([], True, 0, time.perf_counter() - started)
+
+    with tempfile.TemporaryDirectory(prefix='gridlab-', dir=scratch_dir) as directory:
+        search = _ExternalSearch(world, directory, True, buffer_size)
+        stopped = False
+        while not stopped and search.next_bucket() is not None:
+            stopped = not search.expand(True, max_depth, max_nodes)
+
+        actions = None if search.goal is None else search.path()
+        exhausted = search.goal is not None or not (stopped or search.truncated)
+        return SolveResult(actions, exhausted, search.nodes, time.perf_counter() - started)
+
+
+def reachable_states(
+        world: World,
+        *,
+        scratch_dir: str | None = None,
+        max_depth: int | None = None,
+        buffer_size: int = 1 << 16,
+) -> list[int]:
+    """Number of distinct states first reached after each number of steps, enumerated on disk like solve_external.
+
+    States where the goal is reached or the player is dead are not counted.
+    """
+    with tempfile.TemporaryDirectory(prefix='gridlab-', dir=scratch_dir) as directory:
+        search = _ExternalSearch(world, directory, False, buffer_size)
+        while search.next_bucket() is not None:
+            search.expand(False, float('inf') if max_depth is None else max_depth, float('inf'))
+
+        sizes = search.layer_sizes
+        while sizes and not sizes[-1]:
+            sizes.pop()
+
+        return sizes
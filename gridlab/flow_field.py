@@ -0,0 +1,188 @@
+import heapq
+from collections import deque
+
+from gridlab.passability import PassabilityMap
+from gridlab.utils import grid_distance, grid_neighbor_table
+
+
+class FlowField:
+    """Breadth-first distances from a goal cell over a passability map, shared by every entity heading there.
+
+    The field listens to the passability map and repairs only the affected cells when a cell
+    is blocked or unblocked, so entities that move while the field is in use (other chasers
+    in the same tick) see the same distances a fresh search would. Call close() to detach it.
+    """
+
+    def __init__(self, passability: PassabilityMap, goal: tuple[int, int], diagonal: bool = False):
+        self.passability = passability
+        self.goal = goal
+        self.diagonal = diagonal
+        self.width = passability.width
+        self._neighbors = grid_neighbor_table(passability.width, passability.height, diagonal)
+        self._goal_index = goal[1] * self.width + goal[0]
+        self._dist: list[int | None] = [None] * (passability.width * passability.height)
+        self._compute()
+        passability.cell_callbacks.append(self.on_cell_changed)
+
+    def close(self):
+        self.passability.cell_callbacks.remove(self.on_cell_changed)
+
+    def distance(self, x: int, y: int) -> int | None:
+        """Number of steps from (x, y) to the goal, or None if unreachable or impassable."""
+        return self._dist[y * self.width + x]
+
+    def _compute(self):
+        dist = self._dist
+        passable = self.passability.cells
+        if not passable[self._goal_index]:
+            return
+
+        dist[self._goal_index] = 0
+        frontier = deque([self._goal_index])
+        while frontier:
+            current = frontier.popleft()
+            new_cost = dist[current] + 1
+            for n in self._neighbors[current]:
+                if dist[n] is None and passable[n]:
+                    dist[n] = new_cost
+                    frontier.append(n)
+
+    def on_cell_changed(self, x: int, y: int, passable: bool):
+        i = y * self.width + x
+        if passable:
+            self._repair_unblocked(i)
+        else:
+            self._repair_blocked(i)
+
+    def _repair_unblocked(self, i: int):
+        dist = self._dist
+        is_passable = self.passability.cells
+        if i == self._goal_index:
+            dist[i] = 0
+        else:
+            costs = [dist[n] for n in self._neighbors[i] if dist[n] is not None]
+            if not costs:
+                return
+
+            dist[i] = min(costs) + 1
+
+        # Propagate the decrease outward
+        frontier = deque([i])
+        while frontier:
+            current = frontier.popleft()
+            new_cost = dist[current] + 1
+            for n in self._neighbors[current]:
+                if is_passable[n] and (dist[n] is None or new_cost < dist[n]):
+                    dist[n] = new_cost
+                    frontier.append(n)
+
+    def _repair_blocked(self, i: int):
+        dist = self._dist
+        if dist[i] is None:
+            return
+
+        # Collect cells, layer by layer, whose every shortest path to the goal runs through i
+        affected = {i}
+        layer = [i]
+        while layer:
+            next_layer = []
+            for current in layer:
+                child_cost = dist[current] + 1
+                for n in self._neighbors[current]:
+                    if dist[n] != child_cost or n in affected:
+                        continue
+
+                    supported = any(
+                        dist[m] == child_cost - 1 and m not in affected
+                        for m in self._neighbors[n]
+                    )
+                    if not supported:
+                        affected.add(n)
+                        next_layer.append(n)
+
+            layer = next_layer
+
+        for n in affected:
+            dist[n] = None
+
+        # Re-seed the affected cells from their unaffected boundary
+        is_passable = self.passability.cells
+        frontier: list[tuple[int, int]] = []
+        for n in affected:
+            if n == i:
+                continue
+
+            for m in self._neighbors[n]:
+                if dist[m] is not None:
+                    frontier.append((dist[m] + 1, n))
+
+        heapq.heapify(frontier)
+        while frontier:
+            cost, current = heapq.heappop(frontier)
+            if dist[current] is not None:
+                continue
+
+            dist[current] = cost
+            for n in self._neighbors[current]:
+                if dist[n] is None and n in affected and is_passable[n]:
+                    heapq.heappush(frontier, (cost + 1, n))
+
+    def path(self, start: tuple[int, int]) -> list[tuple[int, int]] | None:
+        """Return the path a_star.search finds from start to the goal on the current passability map.
+
+        Only cells on a shortest path to the goal are searched. With a consistent heuristic these are
+        the only cells that ever set the parents on a_star.search's returned path, so running its
+        priorities and tie-breaking over just these cells reproduces the path exactly.
+        """
+        if start == self.goal:
+            return None
+
+        dist = self._dist
+        width = self.width
+        goal = self.goal
+        start_index = start[1] * width + start[0]
+
+        costs = [dist[n] for n in self._neighbors[start_index] if dist[n] is not None]
+        if not costs:
+            return None
+
+        total = min(costs) + 1
+        frontier: list[tuple[tuple[int, int], tuple[int, int]]] = [((0, 0), start)]
+        came_from: dict[int, int | None] = {start_index: None}
+
+        while frontier:
+            _, current = heapq.heappop(frontier)
+            if current == goal:
+                break
+
+            current_index = current[1] * width + current[0]
+            remain = total if current_index == start_index else dist[current_index]
+            new_cost = total - remain + 1
+
+            dx = abs(current[0] - goal[0])
+            dy = abs(current[1] - goal[1])
+            prefer_horizontal = (dx >= dy)
+
+            for n in self._neighbors[current_index]:
+                if dist[n] != remain - 1 or n in came_from:
+                    continue
+
+                came_from[n] = current_index
+                neighbor = (n % width, n // width)
+                score = new_cost + grid_distance(neighbor, goal, diagonal=self.diagonal)
+                if prefer_horizontal:
+                    axis_move = (neighbor[0] != current[0])
+                else:
+                    axis_move = (neighbor[1] != current[1])
+
+                tie = 0 if axis_move else 1
+                heapq.heappush(frontier, ((score, tie), neighbor))
+
+        path: list[tuple[int, int]] = []
+        i = self._goal_index
+        while i != start_index:
+            path.append((i % width, i // width))
+            i = came_from[i]
+
+        path.reverse()
+        return path
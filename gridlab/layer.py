@@ -0,0 +1,17 @@
+import textwrap
+
+
+class Layer:
+    """Grid of characters parsed from a text block, one row per non-blank line."""
+
+    def __init__(self, text: str):
+        lines = [line.strip() for line in textwrap.dedent(text).split('\n') if line.strip()]
+        self.height = len(lines)
+        self.width = len(lines[0]) if lines else 0
+        self.positions_map: dict[str, list[tuple[int, int]]] = {}  # map char -> [(x, y)]
+        for y, line in enumerate(lines):
+            if len(line) != self.width:
+                raise ValueError(f'row {y} has {len(line)} characters, expected {self.width}')
+
+            for x, c in enumerate(line):
+                self.positions_map.setdefault(c, []).append((x, y))
@@ -0,0 +1,198 @@
+import functools
+import heapq
+import math
+import multiprocessing
+import os
+import time
+import traceback
+from typing import Callable
+
+from gridlab.action import Action
+from gridlab.component import Goal
+from gridlab.deadlock import DeadlockDetector
+from gridlab.solver import ACTIONS, SolveResult, fingerprint
+from gridlab.world import World
+from gridlab.world_builder import create_world
+
+
+def _worker(conn, factory: Callable[[], World], index: int, num_workers: int, max_depth: int):
+    try:
+        root = factory()
+        root.enable_undo()
+        deadlocks = DeadlockDetector(root)
+        parents: dict[int, tuple[int, int] | None] = {}  # owned state -> (parent, action index)
+        depths: dict[int, int] = {}  # owned state -> fewest steps found to it
+        frontier: list[tuple[int, int, int, bytes]] = []  # (f, -depth, key, encoded state)
+
+        while True:
+            command, data = conn.recv()
+            if command == 'expand':
+                incoming, bound, budget = data
+                for key, depth, h, parent, action, encoded in incoming:
+                    if depth < depths.get(key, max_depth + 1):
+                        depths[key] = depth
+                        parents[key] = None if parent is None else (parent, action)
+                        heapq.heappush(frontier, (depth + h, -depth, key, encoded))
+
+                buckets: list[list[tuple[int, int, int, int, int, bytes]]] = [[] for _ in range(num_workers)]
+                goals = []
+                sent = set()
+                expanded = 0
+                truncated = False
+                while frontier and frontier[0][:2] <= bound and expanded < budget:
+                    _, depth, key, encoded = heapq.heappop(frontier)
+                    depth = -depth
+                    if depth > depths[key]:
+                        continue  # reached again in fewer steps since it was queued
+
+                    if depth >= max_depth:
+                        truncated = True
+                        continue
+
+                    expanded += 1
+                    node = root.fork()
+                    node.decode(encoded)
+                    for i, action in enumerate(ACTIONS):
+                        node.step(action=action)
+                        h = None
+                        if node.state.goal_reached:
+                            goals.append((key, i))
+                        elif not node.state.player_dead:
+                            h = deadlocks.goal_distance(node)
+
+                        if h is not None:
+                            child = fingerprint(node)
+                            owner = child % num_workers
+                            # Every child this round is one step deeper, so one already sent or known
+                            # to this worker at that depth is a duplicate
+                            known = owner == index and depths.get(child, max_depth + 1) <= depth + 1
+                            if child not in sent and not known:
+                                sent.add(child)
+                                buckets[owner].append((child, depth + 1, h, key, i, node.encode()))
+
+                        node.undo()
+
+                lowest = frontier[0][:2] if frontier else None
+                conn.send(('ok', (buckets, goals, expanded, truncated, lowest)))
+            elif command == 'parent':
+                conn.send(('ok', parents[data]))
+            elif command == 'close':
+                conn.send(('ok', None))
+                break
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _receive(conn):
+    status, message = conn.recv()
+    if status == 'error':
+        raise RuntimeError(f'worker failed:\n{message}')
+
+    return message
+
+
+def solve_parallel(
+        world: str | Callable[[], World],
+        *,
+        num_workers: int | None = None,
+        max_depth: int = 200,
+        max_nodes: int = 1_000_000,
+        context: str | None = None,
+) -> SolveResult:
+    """A* search for a shortest solution from a world's initial state, across worker processes.
+
+    Each state is owned by the worker given by its fingerprint modulo the number of workers,
+    which keeps the open and visited states it owns and expands them. States are ordered by steps
+    taken plus the goal distance around walls and frozen blocks, as in solver.solve, and dropped
+    when no goal can be reached. Each round every worker expands its open states whose estimate is
+    the lowest of all workers, so the first goal found is a shortest solution. Successors are
+    returned bucketed by owner as states encoded with World.encode (not pickled worlds) and routed
+    to their owners for the next round. The parents recorded by the owners give the path once a
+    goal is found. `world` is a registered world name or a picklable factory.
+    """
+    factory = functools.partial(create_world, world) if isinstance(world, str) else world
+    started = time.perf_counter()
+    nodes = 0
+
+    def result(actions: list[Action] | None, exhausted: bool) -> SolveResult:
+        return SolveResult(actions, exhausted, nodes, time.perf_counter() - started)
+
+    root = factory()
+    if not root.em.get(Goal):
+        return result(None, True)
+
+    if root.state.goal_reached:
+        return result([], True)
+
+    h = DeadlockDetector(root).goal_distance(root)
+    if h is None:
+        return result(None, True)
+
+    num_workers = max(1, num_workers or os.cpu_count() or 1)
+    ctx = multiprocessing.get_context(context)
+    conns = []
+    processes = []
+    for index in range(num_workers):
+        conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_worker, args=(child_conn, factory, index, num_workers, max_depth), daemon=True)
+        process.start()
+        child_conn.close()
+        conns.append(conn)
+        processes.append(process)
+
+    try:
+        root_key = fingerprint(root)
+        incoming: list[list] = [[] for _ in range(num_workers)]
+        incoming[root_key % num_workers].append((root_key, 0, h, None, None, root.encode()))
+        bound = h, 0
+        exhausted = True
+        while bound is not None:
+            if nodes >= max_nodes:
+                return result(None, False)
+
+            # Split what is left so a round expands at most max_nodes in total across workers
+            budget = math.ceil((max_nodes - nodes) / num_workers)
+            for conn, batch in zip(conns, incoming):
+                conn.send(('expand', (batch, bound, budget)))
+
+            incoming = [[] for _ in range(num_workers)]
+            goals = []
+            bound = None
+            for conn in conns:
+                buckets, worker_goals, expanded, truncated, lowest = _receive(conn)
+                nodes += expanded
+                goals.extend(worker_goals)
+                exhausted = exhausted and not truncated
+                for owner, bucket in enumerate(buckets):
+                    incoming[owner].extend(bucket)
+                    for _, depth, h, *_ in bucket:
+                        if bound is None or (depth + h, -depth) < bound:
+                            bound = depth + h, -depth
+
+                if lowest is not None and (bound is None or lowest < bound):
+                    bound = lowest
+
+            if goals:
+                key, action = min(goals)
+                actions = [ACTIONS[action]]
+                while key != root_key:
+                    conn = conns[key % num_workers]
+                    conn.send(('parent', key))
+                    key, action = _receive(conn)
+                    actions.append(ACTIONS[action])
+
+                return result(actions[::-1], True)
+
+        return result(None, exhausted)
+    finally:
+        for conn, process in zip(conns, processes):
+            try:
+                conn.send(('close', None))
+                conn.recv()
+            except (EOFError, OSError):
+                pass
+
+            conn.close()
+            process.join()
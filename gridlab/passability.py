@@ -0,0 +1,107 @@
+import array
+import copy
+from typing import Callable
+
+from gridlab.component import Active, Position, Solid
+from gridlab.entity import EntityManager
+from gridlab.grid import Grid
+
+
+class PassabilityMap:
+    """Grid of cells not occupied by an active solid, kept in sync with the entity manager.
+
+    The map counts the active solids on each cell and is updated from the entity manager's
+    component callbacks, so it only changes when a solid moves, is pushed, is removed,
+    or has its Active component toggled.
+    """
+
+    def __init__(self, em: EntityManager, grid: Grid):
+        self.em = em
+        self.width = grid.width
+        self.height = grid.height
+        self._counts = array.array('H', [0]) * (self.width * self.height)
+        self._passable = bytearray(b'\x01') * (self.width * self.height)
+        self._init_views()
+
+        active_map = em.get(Active)
+        position_map = em.get(Position)
+        for ent in em.get(Solid):
+            if ent in active_map and ent in position_map:
+                self._block(position_map[ent])
+
+        em.component_callbacks.append(self.on_component_changed)
+
+    def _init_views(self):
+        # Invoked as callback(x, y, passable) whenever a cell changes between passable and impassable
+        self.cell_callbacks: list[Callable[[int, int, bool], None]] = []
+
+        self._cells = memoryview(self._passable).toreadonly()
+        self._rows = None
+
+    def fork(self, em: EntityManager) -> 'PassabilityMap':
+        """Return a copy for `em`, a fork of this map's entity manager, without rescanning its solids."""
+        passability = copy.copy(self)
+        passability.em = em
+        passability._counts = self._counts[:]
+        passability._passable = self._passable[:]
+        passability._init_views()
+        em.component_callbacks.append(passability.on_component_changed)
+        return passability
+
+    @property
+    def rows(self) -> list[memoryview]:
+        """Read-only rows indexed as rows[y][x] (non-zero when passable), as expected by a_star.search."""
+        if self._rows is None:
+            self._rows = [self._cells[y * self.width:(y + 1) * self.width] for y in range(self.height)]
+
+        return self._rows
+
+    @property
+    def cells(self) -> memoryview:
+        """Read-only flat view indexed as cells[y * width + x] (non-zero when passable)."""
+        return self._cells
+
+    def is_passable(self, x: int, y: int) -> bool:
+        return bool(self._passable[y * self.width + x])
+
+    def _block(self, position: Position):
+        i = position.y * self.width + position.x
+        self._counts[i] += 1
+        if self._counts[i] == 1:
+            self._passable[i] = 0
+            for callback in self.cell_callbacks:
+                callback(position.x, position.y, False)
+
+    def _unblock(self, position: Position):
+        i = position.y * self.width + position.x
+        self._counts[i] -= 1
+        if not self._counts[i]:
+            self._passable[i] = 1
+            for callback in self.cell_callbacks:
+                callback(position.x, position.y, True)
+
+    def on_component_changed(self, ent: int, component_type: type, old, new):
+        if component_type is Position:
+            if ent not in self.em.get(Solid) or ent not in self.em.get(Active):
+                return
+
+            # Block first, so staying on the same cell reports no change to cell_callbacks
+            if new is not None:
+                self._block(new)
+
+            if old is not None:
+                self._unblock(old)
+
+        elif component_type is Active or component_type is Solid:
+            if (old is None) == (new is None):
+                return  # replaced, membership unchanged
+
+            other_type = Solid if component_type is Active else Active
+            position = self.em.get(Position).get(ent)
+            if position is None or ent not in self.em.get(other_type):
+                return
+
+            if new is not None:
+                self._block(position)
+            else:
+                self._unblock(position)
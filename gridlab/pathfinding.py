@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class Pathfinding(StrEnum):
+    A_STAR = 'a_star'  # search from scratch every move
+    FLOW_FIELD = 'flow_field'  # share one distance field per target each tick
+    INCREMENTAL = 'incremental'  # repair a search tree kept between moves
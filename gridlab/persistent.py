@@ -0,0 +1,238 @@
+from collections.abc import ItemsView, Iterator, MutableMapping, ValuesView
+from typing import Any
+
+from gridlab.entity import EntityManager
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_SUBNODE = object()  # key slot marker for entries holding a child node
+_MISSING = object()
+
+
+class _Node:
+    """Immutable HAMT node: `array` holds a (key, value) pair for each bit set in `bitmap`."""
+    __slots__ = ('bitmap', 'array')
+
+    def __init__(self, bitmap: int, array: tuple):
+        self.bitmap = bitmap
+        self.array = array
+
+
+class _Collision:
+    """Immutable node for keys whose hashes are equal in every bit."""
+    __slots__ = ('array',)
+
+    def __init__(self, array: tuple):
+        self.array = array
+
+
+_EMPTY = _Node(0, ())
+
+
+def _hash(key) -> int:
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+def _find(node, h: int, key):
+    shift = 0
+    while True:
+        if type(node) is _Collision:
+            array = node.array
+            for i in range(0, len(array), 2):
+                if array[i] == key:
+                    return array[i + 1]
+
+            return _MISSING
+
+        bit = 1 << ((h >> shift) & _MASK)
+        bitmap = node.bitmap
+        if not bitmap & bit:
+            return _MISSING
+
+        i = 2 * (bitmap & (bit - 1)).bit_count()
+        k = node.array[i]
+        if k is _SUBNODE:
+            node = node.array[i + 1]
+            shift += _BITS
+        elif k is key or k == key:
+            return node.array[i + 1]
+        else:
+            return _MISSING
+
+
+def _merge(shift: int, h1: int, k1, v1, h2: int, k2, v2):
+    if shift >= _HASH_BITS:
+        return _Collision((k1, v1, k2, v2))
+
+    i1 = (h1 >> shift) & _MASK
+    i2 = (h2 >> shift) & _MASK
+    if i1 == i2:
+        return _Node(1 << i1, (_SUBNODE, _merge(shift + _BITS, h1, k1, v1, h2, k2, v2)))
+
+    array = (k1, v1, k2, v2) if i1 < i2 else (k2, v2, k1, v1)
+    return _Node((1 << i1) | (1 << i2), array)
+
+
+def _assoc(node, shift: int, h: int, key, value) -> tuple[Any, bool]:
+    """Return (node with key set to value, whether the key was added)."""
+    array = node.array
+    if type(node) is _Collision:
+        for i in range(0, len(array), 2):
+            if array[i] == key:
+                return _Collision(array[:i + 1] + (value,) + array[i + 2:]), False
+
+        return _Collision(array + (key, value)), True
+
+    bit = 1 << ((h >> shift) & _MASK)
+    i = 2 * (node.bitmap & (bit - 1)).bit_count()
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, array[:i] + (key, value) + array[i:]), True
+
+    k, v = array[i], array[i + 1]
+    if k is _SUBNODE:
+        v, added = _assoc(v, shift + _BITS, h, key, value)
+    elif k is key or k == key:
+        if v is value:
+            return node, False
+
+        k, v, added = key, value, False
+    else:
+        v = _merge(shift + _BITS, _hash(k), k, v, h, key, value)
+        k, added = _SUBNODE, True
+
+    return _Node(node.bitmap, array[:i] + (k, v) + array[i + 2:]), added
+
+
+def _dissoc(node, shift: int, h: int, key):
+    """Return the node without key (None if it becomes empty), or _MISSING if key is absent."""
+    array = node.array
+    if type(node) is _Collision:
+        for i in range(0, len(array), 2):
+            if array[i] == key:
+                array = array[:i] + array[i + 2:]
+                return _Collision(array) if array else None
+
+        return _MISSING
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return _MISSING
+
+    i = 2 * (node.bitmap & (bit - 1)).bit_count()
+    k, v = array[i], array[i + 1]
+    if k is _SUBNODE:
+        child = _dissoc(v, shift + _BITS, h, key)
+        if child is _MISSING:
+            return _MISSING
+
+        if child is not None:
+            # Pull a lone remaining entry up into this node
+            if type(child) is _Node and len(child.array) == 2 and child.array[0] is not _SUBNODE:
+                return _Node(node.bitmap, array[:i] + child.array + array[i + 2:])
+
+            return _Node(node.bitmap, array[:i] + (_SUBNODE, child) + array[i + 2:])
+
+    elif not (k is key or k == key):
+        return _MISSING
+
+    bitmap = node.bitmap & ~bit
+    return _Node(bitmap, array[:i] + array[i + 2:]) if bitmap else None
+
+
+def _iter_items(node) -> Iterator[tuple[Any, Any]]:
+    array = node.array
+    for i in range(0, len(array), 2):
+        k = array[i]
+        if k is _SUBNODE:
+            yield from _iter_items(array[i + 1])
+        else:
+            yield k, array[i + 1]
+
+
+class PersistentMap(MutableMapping):
+    """Dict-like hash array mapped trie whose copies share structure.
+
+    Nodes are never modified: each write copies the path from the root to the changed entry, so
+    `copy` is O(1) and a copy only costs memory for the entries written after it was made.
+    Iteration order follows key hashes rather than insertion order.
+    """
+    __slots__ = ('_root', '_count')
+
+    def __init__(self):
+        self._root = _EMPTY
+        self._count = 0
+
+    def copy(self) -> 'PersistentMap':
+        copied = PersistentMap()
+        copied._root = self._root
+        copied._count = self._count
+        return copied
+
+    def __getitem__(self, key):
+        value = _find(self._root, _hash(key), key)
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def get(self, key, default=None):
+        value = _find(self._root, _hash(key), key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key) -> bool:
+        return _find(self._root, _hash(key), key) is not _MISSING
+
+    def __setitem__(self, key, value):
+        self._root, added = _assoc(self._root, 0, _hash(key), key, value)
+        if added:
+            self._count += 1
+
+    def __delitem__(self, key):
+        root = _dissoc(self._root, 0, _hash(key), key)
+        if root is _MISSING:
+            raise KeyError(key)
+
+        self._root = _EMPTY if root is None else root
+        self._count -= 1
+
+    def __iter__(self) -> Iterator:
+        return (k for k, _ in _iter_items(self._root))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> ItemsView:
+        return _PersistentItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _PersistentValuesView(self)
+
+    def clear(self):
+        self._root = _EMPTY
+        self._count = 0
+
+    def __repr__(self):
+        return f'PersistentMap({dict(self.items())!r})'
+
+
+class _PersistentItemsView(ItemsView):
+    def __iter__(self):
+        return _iter_items(self._mapping._root)
+
+
+class _PersistentValuesView(ValuesView):
+    def __iter__(self):
+        return (v for _, v in _iter_items(self._mapping._root))
+
+
+class PersistentEntityManager(EntityManager):
+    """EntityManager that keeps components and bookkeeping in PersistentMaps.
+
+    `fork` (and so World.fork) then takes time and memory proportional to the number of component
+    types rather than entities, and forks share every entry neither side has changed since.
+    Lookups are slower than with dicts, so this suits searches that hold many sibling states.
+    """
+
+    def _new_map(self) -> PersistentMap:
+        return PersistentMap()
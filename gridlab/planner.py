@@ -0,0 +1,255 @@
+import heapq
+import math
+
+from gridlab.passability import PassabilityMap
+from gridlab.utils import grid_distance, grid_neighbor_table
+
+
+class IncrementalPlanner:
+    """Search tree from one entity to its target that is repaired rather than rebuilt between plans.
+
+    This follows Basic Moving Target D* Lite: a forward LPA* search rooted at the entity's cell.
+    When the target moves the key modifier absorbs the heuristic change, when the entity moves the
+    part of the tree under its new cell is kept and the rest is discarded, and cells whose passability
+    changed since the last plan are the only other ones revisited. The path returned is the one
+    a_star.search takes, picked among the shortest paths in the tree as FlowField.path does.
+    """
+
+    def __init__(self, passability: PassabilityMap, diagonal: bool = False):
+        self.passability = passability
+        self.diagonal = diagonal
+        self.width = passability.width
+        self.expansions = 0  # total cells expanded over all plans
+        self._neighbors = grid_neighbor_table(passability.width, passability.height, diagonal)
+        self._g: dict[int, int] = {}  # missing entries are infinite
+        self._rhs: dict[int, int] = {}
+        self._parent: dict[int, int] = {}
+        self._open: dict[int, tuple[float, float]] = {}
+        self._heap: list[tuple[float, float, int]] = []
+        self._km = 0
+        self._root: int | None = None
+        self._goal: int | None = None
+        self._changed: set[int] = set()
+        passability.cell_callbacks.append(self.on_cell_changed)
+
+    def close(self):
+        self.passability.cell_callbacks.remove(self.on_cell_changed)
+
+    def on_cell_changed(self, x: int, y: int, passable: bool):
+        if self._root is not None:
+            self._changed.add(y * self.width + x)
+
+    def plan(
+            self,
+            start: tuple[int, int],
+            goal: tuple[int, int],
+            full: bool = False,
+    ) -> list[tuple[int, int]] | None:
+        """Return a shortest path from start to goal (excluding start), or None if there is none.
+
+        The previous search tree is reused unless full is True or start is not settled in it.
+        """
+        root = start[1] * self.width + start[0]
+        target = goal[1] * self.width + goal[0]
+        if root == target:
+            return None
+
+        if full or self._root is None or not self._reroot(root):
+            self._reset(root, target)
+        elif target != self._goal:
+            self._km += self._heuristic(self._goal, target)
+            self._goal = target
+
+        for cell in self._changed:
+            if cell != self._root:
+                self._update_vertex(cell)
+
+        self._changed.clear()
+        self._compute()
+        return self._extract()
+
+    def _heuristic(self, a: int, b: int):
+        width = self.width
+        return grid_distance((a % width, a // width), (b % width, b // width), diagonal=self.diagonal)
+
+    def _key(self, cell: int) -> tuple[float, float]:
+        cost = min(self._g.get(cell, math.inf), self._rhs.get(cell, math.inf))
+        return cost + self._heuristic(cell, self._goal) + self._km, cost
+
+    def _reset(self, root: int, target: int):
+        self._g.clear()
+        self._rhs.clear()
+        self._parent.clear()
+        self._open.clear()
+        self._heap.clear()
+        self._km = 0
+        self._root = root
+        self._goal = target
+        self._rhs[root] = 0
+        self._push(root)
+
+    def _reroot(self, root: int) -> bool:
+        if root == self._root:
+            return True
+
+        g = self._g.get(root)
+        if g is None or g != self._rhs.get(root):
+            return False
+
+        children: dict[int, list[int]] = {}
+        for cell, parent in self._parent.items():
+            children.setdefault(parent, []).append(cell)
+
+        subtree = {root}
+        stack = [root]
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                subtree.add(child)
+                stack.append(child)
+
+        deleted = [c for c in {*self._g, *self._rhs, *self._open} if c not in subtree]
+        for cell in deleted:
+            self._g.pop(cell, None)
+            self._rhs.pop(cell, None)
+            self._parent.pop(cell, None)
+            self._open.pop(cell, None)
+
+        # Costs stay relative to the old root; the new root keeps its cost as the base of the tree
+        self._parent.pop(root, None)
+        self._root = root
+        for cell in deleted:
+            self._update_vertex(cell)
+
+        return True
+
+    def _push(self, cell: int):
+        key = self._key(cell)
+        self._open[cell] = key
+        heapq.heappush(self._heap, (*key, cell))
+
+    def _update_open(self, cell: int):
+        if self._g.get(cell, math.inf) != self._rhs.get(cell, math.inf):
+            self._push(cell)
+        else:
+            self._open.pop(cell, None)
+
+    def _update_vertex(self, cell: int):
+        best = math.inf
+        best_parent = None
+        if self.passability.cells[cell]:
+            g = self._g
+            for neighbor in self._neighbors[cell]:
+                cost = g.get(neighbor, math.inf) + 1
+                if cost < best:
+                    best = cost
+                    best_parent = neighbor
+
+        if best_parent is None:
+            self._rhs.pop(cell, None)
+            self._parent.pop(cell, None)
+        else:
+            self._rhs[cell] = best
+            self._parent[cell] = best_parent
+
+        self._update_open(cell)
+
+    def _compute(self):
+        g = self._g
+        rhs = self._rhs
+        root = self._root
+        goal = self._goal
+        cells = self.passability.cells
+        heap = self._heap
+        while heap:
+            k1, k2, cell = heap[0]
+            if self._open.get(cell) != (k1, k2):
+                heapq.heappop(heap)
+                continue
+
+            if (k1, k2) >= self._key(goal) and g.get(goal, math.inf) == rhs.get(goal, math.inf):
+                break
+
+            heapq.heappop(heap)
+            key = self._key(cell)
+            if (k1, k2) < key:
+                self._open[cell] = key
+                heapq.heappush(heap, (*key, cell))
+                continue
+
+            self.expansions += 1
+            del self._open[cell]
+            if g.get(cell, math.inf) > rhs.get(cell, math.inf):
+                cost = g[cell] = rhs[cell]
+                for neighbor in self._neighbors[cell]:
+                    if neighbor != root and cells[neighbor] and cost + 1 < rhs.get(neighbor, math.inf):
+                        rhs[neighbor] = cost + 1
+                        self._parent[neighbor] = cell
+                        self._update_open(neighbor)
+            else:
+                g.pop(cell, None)
+                for neighbor in self._neighbors[cell]:
+                    if neighbor != root and self._parent.get(neighbor) == cell:
+                        self._update_vertex(neighbor)
+
+                self._update_open(cell)
+
+    def _extract(self) -> list[tuple[int, int]] | None:
+        """Return the path a_star.search would take, as FlowField.path does.
+
+        Cells settled before the goal hold their exact cost, so the cells on shortest paths are those
+        reached from the goal through neighbors one cheaper. Running a_star.search's priorities and
+        tie-breaking over just these cells reproduces its path.
+        """
+        g = self._g
+        rhs = self._rhs
+        goal = self._goal
+        if goal not in g or g[goal] != rhs.get(goal):
+            return None
+
+        width = self.width
+        on_path = {goal}
+        stack = [goal]
+        while stack:
+            cell = stack.pop()
+            cost = g[cell] - 1
+            for neighbor in self._neighbors[cell]:
+                if neighbor not in on_path and g.get(neighbor) == cost and rhs.get(neighbor) == cost:
+                    on_path.add(neighbor)
+                    stack.append(neighbor)
+
+        root = self._root
+        goal_x, goal_y = goal % width, goal // width
+        frontier: list[tuple[tuple[int, int], tuple[int, int]]] = [((0, 0), (root % width, root // width))]
+        came_from: dict[int, int] = {}
+        while frontier:
+            _, current = heapq.heappop(frontier)
+            current_index = current[1] * width + current[0]
+            if current_index == goal:
+                break
+
+            cost = g[current_index] + 1
+            new_cost = cost - g[root]
+            prefer_horizontal = abs(current[0] - goal_x) >= abs(current[1] - goal_y)
+            for n in self._neighbors[current_index]:
+                if n not in on_path or g[n] != cost or n in came_from:
+                    continue
+
+                came_from[n] = current_index
+                neighbor = (n % width, n // width)
+                score = new_cost + grid_distance(neighbor, (goal_x, goal_y), diagonal=self.diagonal)
+                if prefer_horizontal:
+                    axis_move = (neighbor[0] != current[0])
+                else:
+                    axis_move = (neighbor[1] != current[1])
+
+                tie = 0 if axis_move else 1
+                heapq.heappush(frontier, ((score, tie), neighbor))
+
+        path: list[tuple[int, int]] = []
+        cell = goal
+        while cell != root:
+            path.append((cell % width, cell // width))
+            cell = came_from[cell]
+
+        path.reverse()
+        return path
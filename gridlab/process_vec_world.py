@@ -0,0 +1,228 @@
+import functools
+import multiprocessing
+import os
+import traceback
+from multiprocessing import shared_memory
+from typing import Callable
+
+from gridlab.action import Action
+from gridlab.env import get_reward
+from gridlab.view.grid import write_entity_codes
+from gridlab.world import World
+from gridlab.world_builder import create_world
+
+
+class _Buffers:
+    """Views over a shared block laid out as float64 rewards, bool dones, then uint8 observations."""
+
+    def __init__(self, buf: memoryview, n: int, height: int, width: int):
+        size = height * width
+        self.rewards = buf[:8 * n].cast('d')
+        self.dones = buf[8 * n:9 * n].cast('?')
+        self.observations = buf[9 * n:9 * n + n * size]
+        self.grid = self.observations.cast('B', (n, height, width)) if n * size else self.observations
+
+    @staticmethod
+    def nbytes(n: int, height: int, width: int) -> int:
+        return n * (9 + height * width)
+
+    def release(self):
+        for view in (self.grid, self.observations, self.dones, self.rewards):
+            view.release()
+
+
+def _worker(conn, factory: Callable[[], World], n: int, start: int, stop: int, shm_name: str, auto_reset: bool):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    template = factory()
+    size = template.grid.width * template.grid.height
+    buffers = _Buffers(shm.buf, n, template.grid.height, template.grid.width)
+    worlds: list[World] = []
+
+    def reset(i: int):
+        worlds[i - start] = template.fork()
+        write_entity_codes(worlds[i - start], buffers.observations, i * size)
+
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'step':
+                for i, action in enumerate(data, start):
+                    world = worlds[i - start]
+                    if world.state.is_finished:  # only without auto_reset, the episode was reported already
+                        buffers.rewards[i] = 0.0
+                        buffers.dones[i] = False
+                        continue
+
+                    world.step(action=action)
+                    state = world.state
+                    buffers.rewards[i] = get_reward(state)
+                    buffers.dones[i] = state.is_finished
+                    if state.is_finished and auto_reset:
+                        reset(i)
+                    else:
+                        write_entity_codes(world, buffers.observations, i * size)
+            elif command == 'reset':
+                worlds = [template] * (stop - start)
+                for i in range(start, stop):
+                    buffers.rewards[i] = 0.0
+                    buffers.dones[i] = False
+                    reset(i)
+            elif command == 'close':
+                conn.send(('ok', None))
+                break
+
+            conn.send(('ok', None))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        buffers.release()
+        shm.close()
+        conn.close()
+
+
+class ProcessVecWorld:
+    """N worlds stepped in parallel by worker processes, each owning a contiguous batch of the worlds.
+
+    Unlike VecWorld this runs the regular World systems, so any World subclass can be used: pass a
+    registered world name or a picklable factory returning a new World. Results are not sent back as
+    messages; workers write them into shared memory read through `observations` (the entity code of
+    each cell, see write_entity_codes, shaped (n, height, width)), `rewards` and `dones`. These are
+    memoryviews that np.asarray wraps without copying, overwritten by each step.
+
+    Worlds that finish are replaced with a fresh copy when `auto_reset` is True, so the observation
+    returned with done set is the first of the next episode. Otherwise they ignore later actions
+    like World.step does, and like VecWorld only the step that finished them reports their reward
+    and done; later steps report 0 and False.
+    """
+
+    def __init__(
+            self,
+            world: str | Callable[[], World],
+            n: int,
+            *,
+            num_workers: int | None = None,
+            auto_reset: bool = True,
+            context: str | None = None,
+    ):
+        factory = functools.partial(create_world, world) if isinstance(world, str) else world
+        template = factory()
+        self.n = n
+        self.width = template.grid.width
+        self.height = template.grid.height
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, _Buffers.nbytes(n, self.height, self.width)))
+        self._buffers = _Buffers(self._shm.buf, n, self.height, self.width)
+        self._waiting = False
+        self._closed = False
+
+        num_workers = max(1, min(n, num_workers or os.cpu_count() or 1))
+        bounds = [n * w // num_workers for w in range(num_workers + 1)]
+        self._batches = list(zip(bounds, bounds[1:]))
+
+        ctx = multiprocessing.get_context(context)
+        self._conns = []
+        self._processes = []
+        for start, stop in self._batches:
+            conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(child_conn, factory, n, start, stop, self._shm.name, auto_reset),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+        self.reset()
+
+    @property
+    def observations(self) -> memoryview:
+        return self._buffers.grid
+
+    @property
+    def rewards(self) -> memoryview:
+        return self._buffers.rewards
+
+    @property
+    def dones(self) -> memoryview:
+        return self._buffers.dones
+
+    def reset(self) -> memoryview:
+        for conn in self._conns:
+            conn.send(('reset', None))
+
+        self._wait()
+        return self.observations
+
+    def step_async(self, actions):
+        """Start stepping every world with its action (an Action or its name) without waiting for the result."""
+        if self._waiting:
+            raise ValueError('step_async called again before step_wait')
+
+        actions = [Action(a) for a in actions]
+        if len(actions) != self.n:
+            raise ValueError(f'expected {self.n} actions, got {len(actions)}')
+
+        for conn, (start, stop) in zip(self._conns, self._batches):
+            conn.send(('step', actions[start:stop]))
+
+        self._waiting = True
+
+    def step_wait(self) -> tuple[memoryview, memoryview, memoryview]:
+        """Wait for the step started by step_async, returning (observations, rewards, dones)."""
+        if not self._waiting:
+            raise ValueError('step_wait called without step_async')
+
+        self._waiting = False
+        self._wait()
+        return self.observations, self.rewards, self.dones
+
+    def step(self, actions) -> tuple[memoryview, memoryview, memoryview]:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def _wait(self):
+        errors = []
+        for conn in self._conns:
+            status, message = conn.recv()
+            if status == 'error':
+                errors.append(message)
+
+        if errors:
+            raise RuntimeError('worker failed:\n' + '\n'.join(errors))
+
+    def close(self):
+        if self._closed:
+            return
+
+        self._closed = True
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                try:
+                    if self._waiting:
+                        conn.recv()
+
+                    conn.send(('close', None))
+                    conn.recv()
+                except (EOFError, OSError):
+                    pass
+
+            conn.close()
+            process.join()
+
+        self._buffers.release()
+        self._shm.unlink()
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # arrays still wrap the buffers, the memory is freed once they are dropped
+
+    def __enter__(self) -> 'ProcessVecWorld':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, '_closed', True):
+            self.close()
@@ -0,0 +1,184 @@
+import collections
+import dataclasses
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Iterable
+
+from gridlab.action import Action
+from gridlab.component import CHANGING_COMPONENTS, ChaseAI, Goal, Position, PositionDelta, Solid
+from gridlab.utils import grid_neighbors
+from gridlab.world import World
+from gridlab.zobrist import component_key
+
+ACTIONS = list(Action)
+
+
+class SearchMethod(StrEnum):
+    BFS = 'bfs'
+    A_STAR = 'a_star'
+
+
+@dataclass
+class SolveResult:
+    """Outcome of a search: `actions` is a shortest solution, or None if none was found.
+
+    When no solution is found, `exhausted` tells whether every state within `max_depth` was
+    searched (so none exists within that depth) rather than the node budget running out.
+    """
+    actions: list[Action] | None
+    exhausted: bool
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+def fingerprint(world: World) -> int:
+    """State hash ignoring what cannot affect later steps.
+
+    PositionDelta is cleared before any system reads it, and ChaseAI.tick only matters modulo
+    the chaser's stagger, so states differing only in those are treated as the same.
+    """
+    value = world.state_hash
+    for ent, delta in world.em.get(PositionDelta).items():
+        value ^= component_key(ent, PositionDelta, delta)
+
+    for ent, ai in world.em.get(ChaseAI).items():
+        if ai.tick >= ai.stagger:
+            value ^= component_key(ent, ChaseAI, ai)
+            value ^= component_key(ent, ChaseAI, dataclasses.replace(ai, tick=ai.tick % ai.stagger))
+
+    return value
+
+
+def goal_distances(world: World, walls: Iterable[int] = ()) -> list[int | None] | None:
+    """Steps from each cell (indexed y * width + x) to the nearest goal, going around permanent walls.
+
+    Walls are solids that can never move, disappear or let the player through, along with the
+    cells in `walls`, so the distance is a lower bound on the steps the player needs; None marks
+    cells from which no goal can be reached. Returns None if a goal could move.
+    """
+    em = world.em
+    width, height = world.grid.width, world.grid.height
+    position_map = em.get(Position)
+    solid_map = em.get(Solid)
+
+    goals = list(em.query(Goal, Position))
+    if any(e in em.get(c) for e in goals for c in CHANGING_COMPONENTS):
+        return None
+
+    blocked = [False] * (width * height)
+    for ent in em.query(Solid, Position):
+        if solid_map[ent].is_blocked(world.player) and not any(ent in em.get(c) for c in CHANGING_COMPONENTS):
+            p = position_map[ent]
+            blocked[p.y * width + p.x] = True
+
+    for i in walls:
+        blocked[i] = True
+
+    distances: list[int | None] = [None] * (width * height)
+    queue = collections.deque()
+    for ent in goals:
+        p = position_map[ent]
+        if not blocked[p.y * width + p.x]:
+            distances[p.y * width + p.x] = 0
+            queue.append((p.x, p.y))
+
+    while queue:
+        x, y = queue.popleft()
+        d = distances[y * width + x] + 1
+        for nx, ny in grid_neighbors((x, y)):
+            i = ny * width + nx
+            if 0 <= nx < width and 0 <= ny < height and not blocked[i] and distances[i] is None:
+                distances[i] = d
+                queue.append((nx, ny))
+
+    return distances
+
+
+def solve(
+        world: World,
+        *,
+        method: SearchMethod | str = SearchMethod.A_STAR,
+        max_depth: int = 200,
+        max_nodes: int = 1_000_000,
+) -> SolveResult:
+    """Search the states reachable from `world` (which is left unchanged) for a shortest sequence of actions reaching a goal.
+
+    States are deduplicated by fingerprint, and states from which no goal can be reached past
+    the walls and frozen blocks (see DeadlockDetector) are dropped. A* orders states by steps taken plus the goal distance, BFS by
+    steps taken alone; both return a shortest solution. `max_depth` bounds the solution length
+    and `max_nodes` the number of states expanded.
+    """
+    method = SearchMethod(method)
+    started = time.perf_counter()
+    nodes = 0
+
+    def result(actions: list[Action] | None, exhausted: bool) -> SolveResult:
+        return SolveResult(actions, exhausted, nodes, time.perf_counter() - started)
+
+    if not world.em.get(Goal):
+        return result(None, True)
+
+    from gridlab.deadlock import DeadlockDetector  # deferred, gridlab.deadlock imports this module
+
+    deadlocks = DeadlockDetector(world)
+
+    def heuristic(w: World) -> int | None:
+        distance = deadlocks.goal_distance(w)
+        return distance if distance is None or method == SearchMethod.A_STAR else 0
+
+    # Children are tried by stepping and undoing their parent, and only forked once popped
+    root = world.fork()
+    root.enable_undo()
+    root_key = fingerprint(root)
+    parents: dict[int, tuple[int, Action] | None] = {root_key: None}
+    depths = {root_key: 0}  # fewest steps found to each state
+    counter = itertools.count()
+    frontier: list[tuple[int, int, int, int, World, Action | None]] = [(0, 0, next(counter), root_key, root, None)]
+    exhausted = True
+    while frontier:
+        _, depth, _, key, node, action = heapq.heappop(frontier)
+        depth = -depth
+        if depth > depths[key]:
+            continue  # reached again in fewer steps since it was queued
+
+        if action is not None:
+            node = node.fork()
+            node.step(action=action)
+
+        if node.state.goal_reached:
+            actions = []
+            while parents[key] is not None:
+                key, action = parents[key]
+                actions.append(action)
+
+            return result(actions[::-1], True)
+
+        if depth >= max_depth:
+            exhausted = False
+            continue
+
+        if nodes >= max_nodes:
+            return result(None, False)
+
+        nodes += 1
+        for action in ACTIONS:
+            node.step(action=action)
+            h = None if node.state.player_dead else heuristic(node)
+            if h is not None:
+                child_key = fingerprint(node)
+                if depths.get(child_key, max_depth + 1) > depth + 1:
+                    parents[child_key] = key, action
+                    depths[child_key] = depth + 1
+                    # Ties go to the deepest state, which is closest to a goal
+                    heapq.heappush(frontier, (depth + 1 + h, -depth - 1, next(counter), child_key, node, action))
+
+            node.undo()
+
+    return result(None, exhausted)
@@ -45,6 +45,13 @@ class State:
     def is_finished(self):
         return self.player_dead or self.goal_reached or self.terminated
 
+    def get_flags(self) -> tuple[bool, bool, bool]:
+        return self._player_dead, self._goal_reached, self._terminated
+
+    def set_flags(self, flags: tuple[bool, bool, bool]):
+        """Restore flags returned by get_flags without invoking callbacks."""
+        self._player_dead, self._goal_reached, self._terminated = flags
+
 
 # class EventManager:
 #     events: dict[tuple[str, int], list[Callable[[tuple[str, int]], None]]] = None
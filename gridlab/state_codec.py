@@ -0,0 +1,201 @@
+import struct
+
+from gridlab.component import (
+    Active,
+    ChaseAI,
+    Door,
+    FixedAI,
+    Identity,
+    Key,
+    KeyCollector,
+    MirrorAI,
+    PatrolAI,
+    Position,
+    Pushable,
+    Pusher,
+    SnakeAI,
+    Switch,
+    Switchable,
+    Timer,
+    TimerReset,
+)
+from gridlab.entity import ENTITY_CODES, ENTITY_TYPES, EntityManager
+from gridlab.state import State
+
+# Entities holding any of these components can move, be removed by the systems, or have counters
+_MOVING = (Pusher, Pushable, PatrolAI, ChaseAI, FixedAI, MirrorAI, SnakeAI)
+_REMOVABLE = (Key, Door, TimerReset, Timer)
+_COUNTERS = ((KeyCollector, 'count'), (ChaseAI, 'tick'), (FixedAI, 'move_index'), (Timer, 'tick'))
+_COUNTER_RANGE = range(-1 << 15, 1 << 15)  # signed, as a key opening two doors leaves a count of -1
+
+
+class StateCodec:
+    """Canonical fixed-width byte encoding of the parts of a world's state that steps can change.
+
+    Compiled from the entities of a newly built world: the state flags, whether each removable
+    entity (keys, doors, timer resets and timers) is still alive, Active on switchables, switch
+    identities and flags, positions of the entities that can move, the counters (key counts,
+    chase, fixed-path and timer ticks, as signed 16-bit values) and the patrol and snake
+    directions. Everything else, such as walls, goals and spikes, never changes and is left
+    out. Equal states encode to equal bytes in any process; chase ticks are stored modulo the
+    chaser's stagger, which is all that matters of them. Entities created after the codec was
+    compiled, such as the markers added when a game ends, are not encoded.
+    """
+
+    def __init__(self, em: EntityManager):
+        def having(*component_types: type) -> list[int]:
+            return sorted({ent for t in component_types for ent in em.get(t)})
+
+        self.removable = having(*_REMOVABLE)
+        self.switchables = having(Switchable)
+        self.switches = having(Switch)
+        self.moving = [ent for ent in having(*_MOVING) if ent in em.get(Position)]
+        self.counters = [(ent, t, name) for t, name in _COUNTERS for ent in sorted(em.get(t))]
+        self.patrols = having(PatrolAI)
+        self.snakes = having(SnakeAI)
+
+        # Bits: 3 state flags, then alive, active, switch pressed/pressable and snake has-direction bits
+        bits = 3 + len(self.removable) + len(self.switchables) + 2 * len(self.switches) + len(self.snakes)
+        self._bit_bytes = (bits + 7) // 8
+        self._struct = struct.Struct(
+            f'<{len(self.switches)}B{2 * len(self.moving)}h{len(self.counters)}h'
+            f'{2 * len(self.patrols) + 2 * len(self.snakes)}b'
+        )
+        self.size = self._bit_bytes + self._struct.size
+
+    def encode(self, em: EntityManager, state: State) -> bytes:
+        bits = 0
+        bit = 1
+
+        def flag(value: bool):
+            nonlocal bits, bit
+            if value:
+                bits |= bit
+
+            bit <<= 1
+
+        for value in state.get_flags():
+            flag(value)
+
+        for ent in self.removable:
+            flag(em.is_alive(ent))
+
+        active_map = em.get(Active)
+        for ent in self.switchables:
+            flag(ent in active_map)
+
+        switch_map = em.get(Switch)
+        identity_map = em.get(Identity)
+        identities = []
+        for ent in self.switches:
+            switch = switch_map[ent]
+            flag(switch.pressed)
+            flag(switch.pressable)
+            identities.append(ENTITY_CODES[identity_map[ent].type])
+
+        snake_map = em.get(SnakeAI)
+        for ent in self.snakes:
+            flag(snake_map[ent].delta is not None)
+
+        values = identities
+        position_map = em.get(Position)
+        for ent in self.moving:
+            p = position_map.get(ent)
+            values += (0, 0) if p is None else (p.x, p.y)
+
+        for ent, component_type, name in self.counters:
+            c = em.get(component_type).get(ent)
+            if c is None:
+                value = 0
+            elif component_type is ChaseAI:
+                value = c.tick % c.stagger
+            else:
+                value = getattr(c, name)
+
+            if value not in _COUNTER_RANGE:
+                raise ValueError(f'{component_type.__name__}.{name} of entity {ent} is {value}, outside {_COUNTER_RANGE}')
+
+            values.append(value)
+
+        patrol_map = em.get(PatrolAI)
+        for ent in self.patrols:
+            values += patrol_map[ent].delta
+
+        for ent in self.snakes:
+            values += snake_map[ent].delta or (0, 0)
+
+        return bits.to_bytes(self._bit_bytes, 'little') + self._struct.pack(*values)
+
+    def decode_into(self, data: bytes, em: EntityManager, state: State):
+        """Set the entity manager and state to an encoded state.
+
+        The entities alive in the encoded state must still be alive in `em` (which is the case for
+        a fork of the world the codec was compiled from, in its initial state). State callbacks
+        are not invoked.
+        """
+        if len(data) != self.size:
+            raise ValueError(f'expected {self.size} bytes, got {len(data)}')
+
+        bits = int.from_bytes(data[:self._bit_bytes], 'little')
+        values = iter(self._struct.unpack_from(data, self._bit_bytes))
+        bit = 1
+
+        def flag() -> bool:
+            nonlocal bit
+            value = bool(bits & bit)
+            bit <<= 1
+            return value
+
+        state.set_flags((flag(), flag(), flag()))
+
+        for ent in self.removable:
+            alive = flag()
+            if alive and not em.is_alive(ent):
+                raise ValueError(f'entity {ent} was removed and cannot be restored')
+
+            if not alive and em.is_alive(ent):
+                em.remove(ent)
+
+        active_map = em.get(Active)
+        for ent in self.switchables:
+            if flag():
+                if ent not in active_map:
+                    em.add_component(ent, Active())
+            elif ent in active_map:
+                em.remove_component(ent, Active)
+
+        switch_map = em.get(Switch)
+        for ent in self.switches:
+            switch = switch_map[ent]
+            switch.pressed = flag()
+            switch.pressable = flag()
+
+        snake_directed = [flag() for _ in self.snakes]
+
+        identity_map = em.get(Identity)
+        for ent in self.switches:
+            entity_type = ENTITY_TYPES[next(values)]
+            if identity_map[ent].type != entity_type:
+                em.add_component(ent, Identity(entity_type))
+
+        position_map = em.get(Position)
+        for ent in self.moving:
+            x, y = next(values), next(values)
+            p = position_map.get(ent)
+            if p is not None and (p.x != x or p.y != y):
+                em.add_component(ent, Position(x, y))
+
+        for ent, component_type, name in self.counters:
+            value = next(values)
+            c = em.get(component_type).get(ent)
+            if c is not None:
+                setattr(c, name, value)
+
+        patrol_map = em.get(PatrolAI)
+        for ent in self.patrols:
+            patrol_map[ent].delta = next(values), next(values)
+
+        snake_map = em.get(SnakeAI)
+        for ent, directed in zip(self.snakes, snake_directed):
+            delta = next(values), next(values)
+            snake_map[ent].delta = delta if directed else None
@@ -0,0 +1,147 @@
+import copy
+from collections.abc import Iterator, MutableMapping
+from typing import Any
+
+from gridlab.component import Active, Deadly, Identity, Position, PositionDelta, Solid
+from gridlab.entity import ENTITY_CODES, ENTITY_TYPES, EntityManager
+
+NUMPY_AVAILABLE = True
+try:
+    import numpy as np
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_MISSING_NUMPY = 'array component storage requires the numpy package (pip install numpy)'
+
+
+class ComponentArray:
+    """Struct-of-arrays storage for one component type, indexed by entity id.
+
+    `mask[ent]` is set when the entity holds the component and each field lives in its own array.
+    """
+
+    def __init__(self, component_type: type, fields: dict[str, Any], capacity: int):
+        self.component_type = component_type
+        self.dtypes = fields
+        self.mask = np.zeros(capacity, dtype=bool)
+        self.fields = {name: np.zeros(capacity, dtype=dtype) for name, dtype in fields.items()}
+        self.count = 0
+
+    def copy(self) -> 'ComponentArray':
+        array = copy.copy(self)
+        array.mask = self.mask.copy()
+        array.fields = {name: values.copy() for name, values in self.fields.items()}
+        return array
+
+    def grow(self, capacity: int):
+        mask = np.zeros(capacity, dtype=bool)
+        mask[:len(self.mask)] = self.mask
+        self.mask = mask
+        for name, array in self.fields.items():
+            grown = np.zeros(capacity, dtype=self.dtypes[name])
+            grown[:len(array)] = array
+            self.fields[name] = grown
+
+
+class ComponentArrayView(MutableMapping):
+    """Dict-like view of a ComponentArray, interchangeable with the dicts returned by EntityManager.get.
+
+    Like those dicts, writing to the view does not notify the entity manager's callbacks.
+    Components are built on read, so changes must be written back, and iteration is in entity id order.
+    """
+
+    def __init__(self, array: ComponentArray):
+        self.array = array
+
+    def _ensure_capacity(self, ent: int):
+        size = len(self.array.mask)
+        if ent >= size:
+            self.array.grow(max(ent + 1, 2 * size))
+
+    def __contains__(self, ent) -> bool:
+        return isinstance(ent, int) and 0 <= ent < len(self.array.mask) and bool(self.array.mask[ent])
+
+    def __getitem__(self, ent: int):
+        if ent not in self:
+            raise KeyError(ent)
+
+        component_type = self.array.component_type
+        fields = self.array.fields
+        if component_type is Identity:
+            return Identity(ENTITY_TYPES[fields['type'][ent]])
+
+        if component_type is Position or component_type is PositionDelta:
+            return component_type(int(fields['x'][ent]), int(fields['y'][ent]))
+
+        if component_type is Solid:
+            return Solid(allow=fields['allow'][ent])
+
+        return component_type()
+
+    def __setitem__(self, ent: int, component):
+        self._ensure_capacity(ent)
+        fields = self.array.fields
+        if isinstance(component, Identity):
+            fields['type'][ent] = ENTITY_CODES[component.type]
+        elif isinstance(component, (Position, PositionDelta)):
+            fields['x'][ent] = component.x
+            fields['y'][ent] = component.y
+        elif isinstance(component, Solid):
+            fields['allow'][ent] = component.allow
+
+        if not self.array.mask[ent]:
+            self.array.mask[ent] = True
+            self.array.count += 1
+
+    def __delitem__(self, ent: int):
+        if ent not in self:
+            raise KeyError(ent)
+
+        self.array.mask[ent] = False
+        self.array.count -= 1
+        if 'allow' in self.array.fields:
+            self.array.fields['allow'][ent] = None
+
+    def copy(self) -> 'ComponentArrayView':
+        return ComponentArrayView(self.array.copy())
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(ent) for ent in np.flatnonzero(self.array.mask))
+
+    def __len__(self) -> int:
+        return self.array.count
+
+    def clear(self):
+        self.array.mask[:] = False
+        self.array.count = 0
+
+
+# Components kept in arrays, with the dtype of each field
+ARRAY_COMPONENTS: dict[type, dict[str, Any]] = {
+    Position: {'x': 'int32', 'y': 'int32'},
+    PositionDelta: {'x': 'int32', 'y': 'int32'},
+    Active: {},
+    Solid: {'allow': 'object'},
+    Deadly: {},
+    Identity: {'type': 'int8'},
+}
+
+
+class ArrayEntityManager(EntityManager):
+    """EntityManager that keeps the hot components in NumPy arrays indexed by entity id.
+
+    `get` returns a ComponentArrayView for those components (dicts for the rest), and `array`
+    exposes the underlying ComponentArray for vectorized access.
+    """
+
+    def __init__(self, capacity: int = 64, recycle_ids: bool = False):
+        if not NUMPY_AVAILABLE:
+            raise ValueError(_MISSING_NUMPY)
+
+        super().__init__(recycle_ids=recycle_ids)
+        for component_type, fields in ARRAY_COMPONENTS.items():
+            array = ComponentArray(component_type, fields, capacity)
+            self._components[component_type] = ComponentArrayView(array)
+
+    def array(self, cls: type) -> ComponentArray:
+        return self._components[cls].array
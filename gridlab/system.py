@@ -1,3 +1,5 @@
+from typing import Container
+
 from gridlab import a_star
 from gridlab.action import Action
 from gridlab.component import (
@@ -24,12 +26,16 @@ from gridlab.component import (
     TimerReset,
 )
 from gridlab.entity import Entity, EntityManager
+from gridlab.flow_field import FlowField
 from gridlab.grid import Grid
+from gridlab.passability import PassabilityMap
+from gridlab.pathfinding import Pathfinding
+from gridlab.planner import IncrementalPlanner
 from gridlab.state import State
+from gridlab.utils import grid_neighbors
 
 
 def move(em: EntityManager, grid: Grid, ent: int, dx: int, dy: int) -> bool:
-    active_map = em.get(Active)
     position_map = em.get(Position)
     pusher_map = em.get(Pusher)
     pushable_map = em.get(Pushable)
@@ -43,25 +49,18 @@ def move(em: EntityManager, grid: Grid, ent: int, dx: int, dy: int) -> bool:
         return False
 
     # 2) Find obstacles
-    for other, solid in solid_map.items():
-        if other not in active_map:
-            continue
-
-        position = position_map[other]
-        if position != target:
-            continue
-
+    for other in em.at(target.x, target.y, with_=Solid, active=True):
         # If pushable, try to push it
         if other in pushable_map:
             if ent not in pusher_map:
                 return False  # ent isn't a pusher
             elif not move(em, grid, other, dx, dy):
                 return False  # pushable couldn't be pushed
-        elif solid.is_blocked(ent):
+        elif solid_map[other].is_blocked(ent):
             return False
 
     # 3) Nothing blocking
-    position_map[ent] = target
+    em.add_component(ent, target)
     em.add_component(ent, PositionDelta(dx, dy))
     return True
 
@@ -76,12 +75,68 @@ def teleport(em: EntityManager, grid: Grid, ent: int, x: int, y: int) -> bool:
 
     dx = x - current.x
     dy = y - current.y
-    position_map[ent] = Position(x, y)
+    em.add_component(ent, Position(x, y))
     em.add_component(ent, PositionDelta(dx, dy))
     return True
 
 
+class PathPlanner:
+    """Finds AI paths with each entity's Pathfinding, keeping the state that is reused between searches."""
+
+    def __init__(self, grid: Grid, passability: PassabilityMap):
+        self.grid = grid
+        self.passability = passability
+        self.planners: dict[int, IncrementalPlanner] = {}
+        self._fields: dict[tuple[tuple[int, int], bool], FlowField] = {}  # keyed by (goal, diagonal)
+
+    def search(
+            self,
+            ent: int,
+            start: tuple[int, int],
+            goal: tuple[int, int],
+            diagonal: bool,
+            pathfinding: Pathfinding,
+    ) -> list[tuple[int, int]] | None:
+        if pathfinding == Pathfinding.FLOW_FIELD:
+            field = self._fields.get((goal, diagonal))
+            if field is None:
+                field = self._fields[goal, diagonal] = FlowField(self.passability, goal, diagonal=diagonal)
+
+            return field.path(start)
+
+        if pathfinding == Pathfinding.INCREMENTAL:
+            planner = self.planners.get(ent)
+            if planner is None or planner.diagonal != diagonal:
+                if planner is not None:
+                    planner.close()
+
+                planner = self.planners[ent] = IncrementalPlanner(self.passability, diagonal=diagonal)
+
+            return planner.plan(start, goal)
+
+        # The entity's own cell is the search start, which is never tested for passability
+        return a_star.search_cells(
+            self.passability.cells,
+            self.grid.width,
+            self.grid.height,
+            start=start,
+            goal=goal,
+            diagonal=diagonal,
+        )
+
+    def end_tick(self, entities: Container[int]):
+        """Release this tick's flow fields and the planners of entities no longer in entities."""
+        for field in self._fields.values():
+            field.close()
+
+        self._fields.clear()
+        for ent in [e for e in self.planners if e not in entities]:
+            self.planners.pop(ent).close()
+
+
 class PositionDeltaSystem:
+    requires = (PositionDelta,)  # component types without which the system has nothing to do, see World.step
+
     def __init__(self, em: EntityManager, state: State,):
         self.em = em
         self.state = state
@@ -90,8 +145,9 @@ class PositionDeltaSystem:
         if self.state.is_finished:
             return
 
-        position_delta_map = self.em.get(PositionDelta)
-        position_delta_map.clear()
+        # Removed through the manager so queries and component callbacks stay in sync
+        for ent in list(self.em.query(PositionDelta)):
+            self.em.remove_component(ent, PositionDelta)
 
 
 class ActionSystem:
@@ -119,32 +175,24 @@ class ActionSystem:
 
 
 class ChaseAISystem:
-    def __init__(self, em: EntityManager, state: State, grid: Grid):
+    requires = (ChaseAI,)
+
+    def __init__(self, em: EntityManager, state: State, grid: Grid, passability: PassabilityMap):
         self.em = em
         self.state = state
         self.grid = grid
+        self.passability = passability
+        self.path_planner = PathPlanner(grid, passability)
 
     def __call__(self):
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
         ai_map = self.em.get(ChaseAI)
         position_map = self.em.get(Position)
-        solid_map = self.em.get(Solid)
-
-        def make_grid(ent: int):
-            grid = [[True for _ in range(self.grid.width)] for _ in range(self.grid.height)]
-            for other in solid_map.keys():
-                if other != ent and other in active_map:
-                    pos = position_map[other]
-                    grid[pos.y][pos.x] = False
 
-            return grid
-
-        for ent, ai in ai_map.items():
-            if ent not in active_map:
-                continue
+        for ent in self.em.query(ChaseAI, active=True):
+            ai = ai_map[ent]
 
             ai.tick += 1
             if ai.tick % ai.stagger != 0:
@@ -153,13 +201,13 @@ class ChaseAISystem:
             entity_pos = position_map[ent]
             target_pos = position_map[ai.target]
 
-            grid = make_grid(ent)
             x, y = entity_pos.x, entity_pos.y
-            path = a_star.search(
-                grid,
+            path = self.path_planner.search(
+                ent,
                 start=(x, y),
                 goal=(target_pos.x, target_pos.y),
                 diagonal=ai.diagonal,
+                pathfinding=ai.pathfinding,
             )
             remain = ai.steps
             while path and remain > 0:
@@ -172,8 +220,12 @@ class ChaseAISystem:
                 remain -= 1
                 x, y = x_new, y_new
 
+        self.path_planner.end_tick(ai_map)
+
 
 class MirrorAISystem:
+    requires = (MirrorAI,)
+
     def __init__(self, em: EntityManager, state: State, grid: Grid):
         self.em = em
         self.state = state
@@ -183,13 +235,11 @@ class MirrorAISystem:
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
         ai_map = self.em.get(MirrorAI)
         position_delta_map = self.em.get(PositionDelta)
 
-        for ent, ai in ai_map.items():
-            if ent not in active_map:
-                continue
+        for ent in self.em.query(MirrorAI, active=True):
+            ai = ai_map[ent]
 
             delta = position_delta_map.get(ai.target)
             if not delta:
@@ -200,6 +250,8 @@ class MirrorAISystem:
 
 
 class PatrolAISystem:
+    requires = (PatrolAI,)
+
     def __init__(self, em: EntityManager, state: State, grid: Grid):
         self.em = em
         self.state = state
@@ -209,14 +261,12 @@ class PatrolAISystem:
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
         ai_map = self.em.get(PatrolAI)
 
         change_dir_map: dict[int, PatrolAI] = {}
 
-        for ent, ai in ai_map.items():
-            if ent not in active_map:
-                continue
+        for ent in self.em.query(PatrolAI, active=True):
+            ai = ai_map[ent]
 
             dx, dy = ai.delta
             if not move(self.em, self.grid, ent, dx, dy):
@@ -230,28 +280,21 @@ class PatrolAISystem:
 
 
 class SnakeAISystem:
-    def __init__(self, em: EntityManager, state: State, grid: Grid):
+    requires = (SnakeAI,)
+
+    def __init__(self, em: EntityManager, state: State, grid: Grid, passability: PassabilityMap):
         self.em = em
         self.state = state
         self.grid = grid
+        self.passability = passability
+        self.path_planner = PathPlanner(grid, passability)
 
     def __call__(self):
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
         ai_map = self.em.get(SnakeAI)
         position_map = self.em.get(Position)
-        solid_map = self.em.get(Solid)
-
-        def make_grid(ent: int):
-            grid = [[True for _ in range(self.grid.width)] for _ in range(self.grid.height)]
-            for other in solid_map.keys():
-                if other != ent and other in active_map:
-                    pos = position_map[other]
-                    grid[pos.y][pos.x] = False
-
-            return grid
 
         def shift(ent: int | None, x: int, y: int):
             while ent:
@@ -261,9 +304,8 @@ class SnakeAISystem:
                 x, y = position.x, position.y
                 ent = ai.next
 
-        for ent, ai in ai_map.items():
-            if ent not in active_map:
-                continue
+        for ent in self.em.query(SnakeAI, active=True):
+            ai = ai_map[ent]
 
             if ent != ai.head:
                 continue
@@ -272,12 +314,12 @@ class SnakeAISystem:
             target_pos = position_map[ai.target]
 
             if not ai.delta:
-                grid = make_grid(ent)
-                path = a_star.search(
-                    grid,
+                path = self.path_planner.search(
+                    ent,
                     start=(entity_pos.x, entity_pos.y),
                     goal=(target_pos.x, target_pos.y),
                     diagonal=ai.diagonal,
+                    pathfinding=ai.pathfinding,
                 )
                 remain = ai.steps
                 x, y = entity_pos.x, entity_pos.y
@@ -309,8 +351,12 @@ class SnakeAISystem:
 
                 ai.delta = dx, dy
 
+        self.path_planner.end_tick(ai_map)
+
 
 class DoorSystem:
+    requires = (Key, Door)  # every player collects keys, so those alone say nothing
+
     def __init__(self, em: EntityManager, state: State):
         self.em = em
         self.state = state
@@ -319,39 +365,22 @@ class DoorSystem:
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
-        door_map = self.em.get(Door)
-        key_map = self.em.get(Key)
         collector_map = self.em.get(KeyCollector)
         position_map = self.em.get(Position)
 
-        for collector_ent, collector in collector_map.items():
-            if collector_ent not in active_map:
-                continue
-
+        for collector_ent in self.em.query(KeyCollector, Position, active=True):
+            collector = collector_map[collector_ent]
             collector_pos = position_map[collector_ent]
-            keys_remove: list[int] = []
-            for key_ent, _ in key_map.items():
-                if key_ent not in active_map:
-                    continue
-
-                key_pos = position_map[key_ent]
-                if key_pos == collector_pos:
-                    keys_remove.append(key_ent)
-                    collector.count += 1
-
+            keys_remove = self.em.at(collector_pos.x, collector_pos.y, with_=Key, active=True)
+            collector.count += len(keys_remove)
             self.em.remove_all(keys_remove)
 
             if collector.count < 1:
                 continue
 
             doors_remove: list[int] = []
-            for door_ent, _ in door_map.items():
-                if door_ent not in active_map:
-                    continue
-
-                door_pos = position_map[door_ent]
-                if collector_pos.is_adjacent(door_pos):
+            for x, y in grid_neighbors((collector_pos.x, collector_pos.y)):
+                for door_ent in self.em.at(x, y, with_=Door, active=True):
                     collector.count -= 1
                     doors_remove.append(door_ent)
 
@@ -359,6 +388,8 @@ class DoorSystem:
 
 
 class TimerSystem:
+    requires = (Timer,)
+
     def __init__(
             self,
             em: EntityManager,
@@ -374,27 +405,15 @@ class TimerSystem:
         if not timer_map:
             return
 
-        active_map = self.em.get(Active)
-        timer_reset_map = self.em.get(TimerReset)
         position_map = self.em.get(Position)
         player_pos = position_map[self.player]
 
-        timer_resets_remove: list[int] = []
-        for ent, _ in timer_reset_map.items():
-            if ent not in active_map:
-                continue
-
-            timer_reset_pos = position_map[ent]
-            if player_pos == timer_reset_pos:
-                timer_resets_remove.append(ent)
-
+        timer_resets_remove = self.em.at(player_pos.x, player_pos.y, with_=TimerReset, active=True)
         self.em.remove_all(timer_resets_remove)
 
         expired_entities: list[int] = []
-        for ent, timer in timer_map.items():
-            if ent not in active_map:
-                continue
-
+        for ent in self.em.query(Timer, active=True):
+            timer = timer_map[ent]
             timer.tick += 1
             if timer_resets_remove:
                 timer.tick = 0
@@ -408,6 +427,8 @@ class TimerSystem:
 
 
 class SwitchSystem:
+    requires = (Switch,)
+
     def __init__(self, em: EntityManager, state: State):
         self.em = em
         self.state = state
@@ -417,25 +438,20 @@ class SwitchSystem:
             return
 
         active_map = self.em.get(Active)
-        id_map = self.em.get(Identity)
         position_map = self.em.get(Position)
         switch_map = self.em.get(Switch)
         switchable_map = self.em.get(Switchable)
-        switch_presser_map = self.em.get(SwitchPresser)
 
         # Collect switches that are overlapped by trigger entities this tick
         triggered_switches: dict[int, bool] = {}
-        for switch_ent, switch in switch_map.items():
+        for switch_ent in self.em.query(Switch, Position):
             switch_pos = position_map[switch_ent]
-            overlap = any(
-                True for e, p in position_map.items()
-                if e in switch_presser_map and p == switch_pos
-            )
-            if overlap:
-                triggered_switches[switch_ent] = switch.pressable
+            if self.em.at(switch_pos.x, switch_pos.y, with_=SwitchPresser):
+                triggered_switches[switch_ent] = switch_map[switch_ent].pressable
 
         # Handle solo and group switches
-        for switch_ent, switch in switch_map.items():
+        for switch_ent in self.em.query(Switch):
+            switch = switch_map[switch_ent]
             if switch.group is not None:
                 # Only the pressable one can be triggered
                 if triggered_switches.get(switch_ent):
@@ -443,7 +459,7 @@ class SwitchSystem:
                     index = group.index(switch_ent)
                     switch.pressed = True
                     switch.pressable = False
-                    id_map[switch_ent].type = Entity.SWITCH_UNPRESSABLE
+                    self.em.add_component(switch_ent, Identity(Entity.SWITCH_UNPRESSABLE))
 
                     # Find the next switch in the group (cycle order)
                     next_idx = (index + 1) % len(group)
@@ -451,7 +467,7 @@ class SwitchSystem:
                     next_switch = switch_map[next_ent]
                     next_switch.pressable = True
                     next_switch.pressed = False
-                    id_map[next_ent].type = Entity.SWITCH_PRESSABLE
+                    self.em.add_component(next_ent, Identity(Entity.SWITCH_PRESSABLE))
 
                     # Set all other group switches to not pressable/pressed (optional but robust)
                     for other_ent in group:
@@ -459,7 +475,7 @@ class SwitchSystem:
                             other = switch_map[other_ent]
                             other.pressable = False
                             other.pressed = False
-                            id_map[other_ent].type = Entity.SWITCH_UNPRESSABLE
+                            self.em.add_component(other_ent, Identity(Entity.SWITCH_UNPRESSABLE))
                 else:
                     switch.pressed = False
 
@@ -467,27 +483,30 @@ class SwitchSystem:
                 if switch_ent not in triggered_switches:
                     switch.pressed = False
                     switch.pressable = True
-                    id_map[switch_ent].type = Entity.SWITCH_PRESSABLE
+                    self.em.add_component(switch_ent, Identity(Entity.SWITCH_PRESSABLE))
                 elif triggered_switches[switch_ent]:
                     switch.pressed = True
                     switch.pressable = False
-                    id_map[switch_ent].type = Entity.SWITCH_UNPRESSABLE
+                    self.em.add_component(switch_ent, Identity(Entity.SWITCH_UNPRESSABLE))
                 else:
                     switch.pressed = False
                     switch.pressable = False
-                    id_map[switch_ent].type = Entity.SWITCH_UNPRESSABLE
+                    self.em.add_component(switch_ent, Identity(Entity.SWITCH_UNPRESSABLE))
 
         # Activate/deactivate Switchable entities
-        for switchable_ent, switchable in switchable_map.items():
+        for switchable_ent in self.em.query(Switchable):
+            switchable = switchable_map[switchable_ent]
             # If any of the triggers are currently pressed, toggle active state
             if any(switch_map[s].pressed for s in switchable.triggers if s in switch_map):
                 if switchable_ent in active_map:
-                    active_map.pop(switchable_ent)
+                    self.em.remove_component(switchable_ent, Active)
                 else:
-                    active_map[switchable_ent] = Active()
+                    self.em.add_component(switchable_ent, Active())
 
 
 class DeathSystem:
+    requires = (Deadly,)
+
     def __init__(
             self,
             em: EntityManager,
@@ -502,21 +521,18 @@ class DeathSystem:
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
         position_map = self.em.get(Position)
-        deadly_map = self.em.get(Deadly)
         position = position_map[self.player]
-        overlap = [
-            e for e, p in position_map.items()
-            if e != self.player and e in active_map and p == position
-        ]
-        if not any(e in deadly_map for e in overlap):
+        overlap = self.em.at(position.x, position.y, with_=Deadly, active=True)
+        if not any(e != self.player for e in overlap):
             return
 
         self.state.player_dead = True
 
 
 class GoalSystem:
+    requires = (Goal,)
+
     def __init__(
             self,
             em: EntityManager,
@@ -531,12 +547,9 @@ class GoalSystem:
         if self.state.is_finished:
             return
 
-        active_map = self.em.get(Active)
         position_map = self.em.get(Position)
-        goal_map = self.em.get(Goal)
         p1 = position_map[self.player]
-        goal_positions = [position_map[e] for e in goal_map if e in active_map]
-        if any((p1.x, p1.y) == (p2.x, p2.y) for p2 in goal_positions):
+        if self.em.at(p1.x, p1.y, with_=Goal, active=True):
             self.state.goal_reached = True
 
 
@@ -0,0 +1,128 @@
+import copy
+from collections import OrderedDict
+from typing import Any, Container, Hashable, NamedTuple
+
+from gridlab.entity import EntityManager
+
+
+class Transition(NamedTuple):
+    """Changes made by one step, replayable on any world in the same starting state.
+
+    `changes` follows the entity manager's journal: ('create', ent), ('remove', ent) and
+    ('component', ent, component_type, new) where new is None for a removed component.
+    `fields` holds the fields changed in place on components of the mutable types.
+    """
+    changes: tuple[tuple, ...]
+    fields: tuple[tuple[int, type, dict[str, Any]], ...]
+    flags: tuple[bool, bool, bool]
+
+
+def save_fields(em: EntityManager, mutable: tuple[type, ...]) -> dict[tuple[int, type], tuple[object, dict[str, Any]]]:
+    """Fields of every component of the mutable types, to pass to record_transition after the step."""
+    return {(e, t): (c, vars(c).copy()) for t in mutable for e, c in em.get(t).items()}
+
+
+def record_transition(
+        em: EntityManager,
+        mark: int,
+        saved: dict[tuple[int, type], tuple[object, dict[str, Any]]],
+        mutable: Container[type],
+        flags: tuple[bool, bool, bool],
+) -> Transition:
+    """Build the Transition for the changes journaled by `em` since `mark`."""
+    journal = em.journal_since(mark)
+
+    # The journal holds the value each change replaced, so the value it set is the one the next
+    # change of the same component replaced, or the current value for the last change
+    current: dict[tuple[int, type], Any] = {}
+    changes = []
+    for kind, ent, *change in reversed(journal):
+        if kind == 'component':
+            component_type, old = change
+            key = ent, component_type
+            new = current[key] if key in current else em.get(component_type).get(ent)
+            current[key] = old
+            if new is not None and component_type in mutable:
+                new = copy.copy(new)
+
+            changes.append(('component', ent, component_type, new))
+        else:
+            changes.append((kind, ent))
+
+    changes.reverse()
+
+    fields = []
+    for (ent, component_type), (c, before) in saved.items():
+        if em.get(component_type).get(ent) is c:
+            after = vars(c)
+            changed = {k: v for k, v in after.items() if before.get(k) != v}
+            if changed:
+                fields.append((ent, component_type, copy.deepcopy(changed)))
+
+    return Transition(tuple(changes), tuple(fields), flags)
+
+
+def apply_transition(em: EntityManager, transition: Transition, mutable: Container[type]):
+    """Replay a recorded transition, mapping the entities it created to the ids `em` hands out."""
+    ids: dict[int, int] = {}
+    for kind, ent, *change in transition.changes:
+        if kind == 'create':
+            ids[ent] = em.create()
+            continue
+
+        ent = ids.get(ent, ent)
+        if kind == 'remove':
+            em.remove(ent)
+            continue
+
+        component_type, new = change
+        if new is None:
+            em.remove_component(ent, component_type)
+        else:
+            em.add_component(ent, copy.copy(new) if component_type in mutable else new)
+
+    for ent, component_type, changed in transition.fields:
+        vars(em.get(component_type)[ent]).update(copy.deepcopy(changed))
+
+
+class TransitionCache:
+    """Bounded LRU map of (state hash, actions) to the Transition the step made.
+
+    Shared by forks of the world that enabled it, since they follow the same rules.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be positive, got {maxsize}')
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._transitions: OrderedDict[Hashable, Transition] = OrderedDict()
+
+    def get(self, key: Hashable) -> Transition | None:
+        transition = self._transitions.get(key)
+        if transition is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._transitions.move_to_end(key)
+
+        return transition
+
+    def put(self, key: Hashable, transition: Transition):
+        self._transitions[key] = transition
+        self._transitions.move_to_end(key)
+        if len(self._transitions) > self.maxsize:
+            self._transitions.popitem(last=False)
+
+    def clear(self):
+        self._transitions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._transitions)
+
+    def __repr__(self):
+        return f'TransitionCache(size={len(self)}, maxsize={self.maxsize}, hits={self.hits}, misses={self.misses})'
@@ -1,3 +1,5 @@
+import functools
+
 
 def grid_distance(a: tuple[int, int], b: tuple[int, int], diagonal: bool = False) -> int:
     x1, y1 = a
@@ -18,3 +20,15 @@ def grid_neighbors(
         neighbors = [(x + 1, y + 1), (x + 1, y - 1), (x - 1, y + 1), (x - 1, y - 1), *neighbors]
 
     return neighbors
+
+
+@functools.cache
+def grid_neighbor_table(width: int, height: int, diagonal: bool = False) -> tuple[tuple[int, ...], ...]:
+    """In-bounds neighbors of every cell as flat indices (y * width + x), in grid_neighbors order."""
+    table = []
+    for y in range(height):
+        for x in range(width):
+            neighbors = grid_neighbors((x, y), diagonal=diagonal)
+            table.append(tuple(ny * width + nx for nx, ny in neighbors if 0 <= nx < width and 0 <= ny < height))
+
+    return tuple(table)
@@ -0,0 +1,656 @@
+from gridlab import a_star
+from gridlab.action import Action
+from gridlab.component import (
+    Active,
+    ChaseAI,
+    Deadly,
+    Door,
+    Fog,
+    Goal,
+    Identity,
+    Key,
+    KeyCollector,
+    MirrorAI,
+    PatrolAI,
+    Position,
+    PositionDelta,
+    Pushable,
+    Pusher,
+    SnakeAI,
+    Solid,
+    Switch,
+    SwitchPresser,
+    Switchable,
+    Timer,
+    TimerReset,
+)
+from gridlab.entity import Entity
+from gridlab.utils import grid_neighbors
+from gridlab.world import World
+from gridlab.world_builder import create_world
+
+NUMPY_AVAILABLE = True
+try:
+    import numpy as np
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_MISSING_NUMPY = 'VecWorld requires the numpy package (pip install numpy)'
+
+ACTIONS = list(Action)
+
+# Most recent paths keyed by (passable cells, start, goal, diagonal), shared by every VecWorld
+_PATH_CACHE: dict[tuple[bytes, tuple[int, int], tuple[int, int], bool], list[tuple[int, int]] | None] = {}
+_PATH_CACHE_SIZE = 1 << 14
+
+
+class VecWorld:
+    """N copies of a registered world stepped in lock step, with the state of every copy held in NumPy arrays.
+
+    Follows the rules of the systems in gridlab.system. Movement and pushing, patrol and mirror enemies,
+    doors, switches, timers, and death and goal checks are vectorized across copies. Chase and snake
+    enemies search for paths per copy with a_star.search_cells (worlds using flow-field or incremental
+    pathfinding are simulated with A*). Copies that finish are reset after the step that finished them
+    unless `auto_reset` is False, in which case they ignore later actions like World.step does.
+    """
+
+    def __init__(self, name: str, n: int, auto_reset: bool = True):
+        if not NUMPY_AVAILABLE:
+            raise ValueError(_MISSING_NUMPY)
+
+        self.name = name
+        self.n = n
+        self.auto_reset = auto_reset
+        self._template = create_world(name)
+        self._compile(self._template)
+        self.reset()
+
+    def _compile(self, world: World):
+        em = world.em
+        self.width = world.grid.width
+        self.height = world.grid.height
+        self.player = world.player
+        self.num_entities = num_entities = em._next_ent
+        entities = range(num_entities)
+
+        position_map = em.get(Position)
+        if any(not em.is_alive(e) or e not in position_map for e in entities):
+            raise ValueError(f'world {self.name!r} has entities without a position')
+
+        def has(component_type: type):
+            component_map = em.get(component_type)
+            return np.array([e in component_map for e in entities], dtype=bool)
+
+        def ids(component_type: type):
+            return list(em.query(component_type))
+
+        self.solid = has(Solid)
+        self.pushable = has(Pushable)
+        self.pusher = has(Pusher)
+        self.presser = has(SwitchPresser)
+        self.deadly_ids = np.array([e for e in ids(Deadly) if e != self.player], dtype=np.int64)
+        self.goal_ids = np.array(ids(Goal), dtype=np.int64)
+        self.key_ids = np.array(ids(Key), dtype=np.int64)
+        self.door_ids = np.array(ids(Door), dtype=np.int64)
+        self.timer_reset_ids = np.array(ids(TimerReset), dtype=np.int64)
+        self.fog_ids = np.array(ids(Fog), dtype=np.int64)
+        self.presser_ids = np.flatnonzero(self.presser)
+
+        # Entities allowed through each solid, padded with -1
+        solid_map = em.get(Solid)
+        allows = [tuple(solid_map[e].allow or ()) if e in solid_map else () for e in entities]
+        self.allow = np.full((num_entities, max([1, *map(len, allows)])), -1, dtype=np.int64)
+        for e, allow in enumerate(allows):
+            self.allow[e, :len(allow)] = allow
+
+        self.x0 = np.array([position_map[e].x for e in entities], dtype=np.int64)
+        self.y0 = np.array([position_map[e].y for e in entities], dtype=np.int64)
+        self.active0 = has(Active)
+
+        collector_map = em.get(KeyCollector)
+        self.collector_ids = ids(KeyCollector)
+        self.key_count0 = np.array([collector_map[e].count for e in self.collector_ids], dtype=np.int64)
+
+        timer_map = em.get(Timer)
+        self.timer_ids = ids(Timer)
+        self.timer_limit = np.array([timer_map[e].limit for e in self.timer_ids], dtype=np.int64)
+        self.timer_tick0 = np.array([timer_map[e].tick for e in self.timer_ids], dtype=np.int64)
+
+        self.chase_ids = ids(ChaseAI)
+        self.chase_ai = [em.get(ChaseAI)[e] for e in self.chase_ids]
+        self.chase_tick0 = np.array([ai.tick for ai in self.chase_ai], dtype=np.int64)
+
+        self.patrol_ids = ids(PatrolAI)
+        self.patrol_delta0 = np.array([em.get(PatrolAI)[e].delta for e in self.patrol_ids], dtype=np.int64)
+        self.patrol_delta0 = self.patrol_delta0.reshape(len(self.patrol_ids), 2)
+
+        self.mirror_ids = ids(MirrorAI)
+        self.mirror_ai = [em.get(MirrorAI)[e] for e in self.mirror_ids]
+
+        snake_map = em.get(SnakeAI)
+        self.snake_ids = ids(SnakeAI)
+        self.snake_index = {e: i for i, e in enumerate(self.snake_ids)}
+        self.snake_ai = [snake_map[e] for e in self.snake_ids]
+        self.snake_delta0 = np.array([ai.delta or (0, 0) for ai in self.snake_ai], dtype=np.int64)
+        self.snake_delta0 = self.snake_delta0.reshape(len(self.snake_ids), 2)
+        self.snake_has_delta0 = np.array([bool(ai.delta) for ai in self.snake_ai], dtype=bool)
+
+        switch_map = em.get(Switch)
+        self.switch_ids = ids(Switch)
+        switch_index = {e: i for i, e in enumerate(self.switch_ids)}
+        self.switch_groups = [
+            None if switch_map[e].group is None else [switch_index[s] for s in switch_map[e].group]
+            for e in self.switch_ids
+        ]
+        self.pressed0 = np.array([switch_map[e].pressed for e in self.switch_ids], dtype=bool)
+        self.pressable0 = np.array([switch_map[e].pressable for e in self.switch_ids], dtype=bool)
+
+        switchable_map = em.get(Switchable)
+        self.switchable_ids = ids(Switchable)
+        self.switchable_triggers = [
+            [switch_index[s] for s in switchable_map[e].triggers if s in switch_index]
+            for e in self.switchable_ids
+        ]
+
+    def reset(self, mask=None):
+        """Reset every copy, or the copies where `mask` is True, to the world's initial state."""
+        if mask is None:
+            n, e = self.n, self.num_entities
+            self.x = np.empty((n, e), dtype=np.int64)
+            self.y = np.empty((n, e), dtype=np.int64)
+            self.active = np.empty((n, e), dtype=bool)
+            self.alive = np.empty((n, e), dtype=bool)
+            self.delta = np.empty((n, e, 2), dtype=np.int64)
+            self.has_delta = np.empty((n, e), dtype=bool)
+            self.count = np.empty((n, self.width * self.height), dtype=np.int64)  # live solids per cell
+            self.total = np.empty((n, self.width * self.height), dtype=np.int64)  # sum of their ids
+            self.key_count = np.empty((n, len(self.collector_ids)), dtype=np.int64)
+            self.timer_tick = np.empty((n, len(self.timer_ids)), dtype=np.int64)
+            self.chase_tick = np.empty((n, len(self.chase_ids)), dtype=np.int64)
+            self.patrol_delta = np.empty((n, len(self.patrol_ids), 2), dtype=np.int64)
+            self.snake_delta = np.empty((n, len(self.snake_ids), 2), dtype=np.int64)
+            self.snake_has_delta = np.empty((n, len(self.snake_ids)), dtype=bool)
+            self.pressed = np.empty((n, len(self.switch_ids)), dtype=bool)
+            self.pressable = np.empty((n, len(self.switch_ids)), dtype=bool)
+            self.player_dead = np.empty(n, dtype=bool)
+            self.goal_reached = np.empty(n, dtype=bool)
+            self.turn = np.empty(n, dtype=np.int64)
+            mask = slice(None)
+
+        self.x[mask] = self.x0
+        self.y[mask] = self.y0
+        self.active[mask] = self.active0
+        self.alive[mask] = True
+        self.delta[mask] = 0
+        self.has_delta[mask] = False
+        self.key_count[mask] = self.key_count0
+        self.timer_tick[mask] = self.timer_tick0
+        self.chase_tick[mask] = self.chase_tick0
+        self.patrol_delta[mask] = self.patrol_delta0
+        self.snake_delta[mask] = self.snake_delta0
+        self.snake_has_delta[mask] = self.snake_has_delta0
+        self.pressed[mask] = self.pressed0
+        self.pressable[mask] = self.pressable0
+        self.player_dead[mask] = False
+        self.goal_reached[mask] = False
+        self.turn[mask] = 1
+
+        solids = np.flatnonzero(self.solid & self.active0)
+        cells = self.y0[solids] * self.width + self.x0[solids]
+        count = np.zeros(self.width * self.height, dtype=np.int64)
+        total = np.zeros(self.width * self.height, dtype=np.int64)
+        np.add.at(count, cells, 1)
+        np.add.at(total, cells, solids)
+        self.count[mask] = count
+        self.total[mask] = total
+
+    @property
+    def finished(self):
+        return self.player_dead | self.goal_reached
+
+    def step(self, actions) -> tuple['np.ndarray', 'np.ndarray']:
+        """Apply one player action per copy and run every system.
+
+        `actions` holds an Action (or its name) per copy, or an integer array indexing list(Action).
+        Returns the (goal_reached, player_dead) flags set by this step, before any copies are reset.
+        """
+        actions = self._action_indices(actions)
+        stepping = ~self.finished
+        running = stepping.copy()
+
+        self.has_delta[running] = False
+        self._action_system(running, actions)
+        self._death_system(running)
+        self._door_system(running)
+        self._switch_system(running)
+        self._patrol_ai_system(running)
+        self._mirror_ai_system(running)
+        self._chase_ai_system(running)
+        self._snake_ai_system(running)
+        self._death_system(running)
+        self._goal_system(running)
+        self._timer_system(stepping)
+        self.turn[stepping] += 1
+
+        goal_reached = self.goal_reached & stepping
+        player_dead = self.player_dead & stepping
+        if self.auto_reset and (goal_reached | player_dead).any():
+            self.reset(goal_reached | player_dead)
+
+        return goal_reached, player_dead
+
+    def _action_indices(self, actions) -> 'np.ndarray':
+        if isinstance(actions, np.ndarray) and actions.dtype.kind in 'iu':
+            indices = actions.astype(np.int64, copy=False)
+        else:
+            indices = np.array([ACTIONS.index(Action(a)) for a in actions], dtype=np.int64)
+
+        if indices.shape != (self.n,):
+            raise ValueError(f'expected {self.n} actions, got {indices.shape}')
+
+        return indices
+
+    # State updates
+
+    def _occupy(self, idx, ents, sign: int):
+        solid = self.solid[ents] & self.active[idx, ents] & self.alive[idx, ents]
+        idx, ents = idx[solid], ents[solid]
+        cells = self.y[idx, ents] * self.width + self.x[idx, ents]
+        np.add.at(self.count, (idx, cells), sign)
+        np.add.at(self.total, (idx, cells), sign * ents)
+
+    def _set_position(self, idx, ents, x, y):
+        self._occupy(idx, ents, -1)
+        self.delta[idx, ents, 0] = x - self.x[idx, ents]
+        self.delta[idx, ents, 1] = y - self.y[idx, ents]
+        self.has_delta[idx, ents] = True
+        self.x[idx, ents] = x
+        self.y[idx, ents] = y
+        self._occupy(idx, ents, 1)
+
+    def _set_active(self, idx, ents, active):
+        self._occupy(idx, ents, -1)
+        self.active[idx, ents] = active
+        self._occupy(idx, ents, 1)
+
+    def _remove(self, idx, ents):
+        self._occupy(idx, ents, -1)
+        self.alive[idx, ents] = False
+
+    def _kill(self, mask):
+        # Mirrors the player death and goal callbacks, which clear the fog
+        self.player_dead |= mask
+        self._clear_fog(mask)
+
+    def _clear_fog(self, mask):
+        idx = np.flatnonzero(mask)
+        if idx.size and self.fog_ids.size:
+            self.alive[np.ix_(idx, self.fog_ids)] = False
+
+    def _at(self, ids, x, y, active: bool = True):
+        """(copies, len(ids)) mask of the entities in ids positioned at per-copy (x, y)."""
+        match = self.alive[:, ids] & (self.x[:, ids] == x[:, None]) & (self.y[:, ids] == y[:, None])
+        if active:
+            match &= self.active[:, ids]
+
+        return match
+
+    # Movement
+
+    def _move(self, idx, ents, dx, dy):
+        """Vectorized move for one entity per copy in idx, returning which moves succeeded.
+
+        Cells holding at most one solid are resolved for all copies at once, pushing chains of
+        pushables as move does. Copies where a cell holds several solids fall back to _move_one.
+        """
+        ok = np.zeros(len(idx), dtype=bool)
+        fallback = []
+        chain = []  # (positions in idx, pushed entities) for each push depth
+        pending = np.arange(len(idx))
+        mover = ents.copy()
+        tx = self.x[idx, ents] + dx
+        ty = self.y[idx, ents] + dy
+        for _ in range(self.width + self.height):
+            x, y = tx[pending], ty[pending]
+            inbounds = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+            pending, x, y = pending[inbounds], x[inbounds], y[inbounds]
+            if not pending.size:
+                break
+
+            cells = y * self.width + x
+            count = self.count[idx[pending], cells]
+            ok[pending[count == 0]] = True
+            fallback.extend(pending[count > 1])
+
+            single = count == 1
+            pending, cells = pending[single], cells[single]
+            other = self.total[idx[pending], cells]
+            pushable = self.pushable[other]
+            allowed = (self.allow[other] == mover[pending, None]).any(axis=1)
+            ok[pending[~pushable & allowed]] = True
+
+            push = pushable & self.pusher[mover[pending]]
+            pending, other = pending[push], other[push]
+            chain.append((pending, other))
+            mover[pending] = other
+            tx[pending] += dx[pending]
+            ty[pending] += dy[pending]
+
+        for pending, other in reversed(chain):
+            moved = pending[ok[pending]]
+            other = other[ok[pending]]
+            self._set_position(idx[moved], other, self.x[idx[moved], other] + dx[moved], self.y[idx[moved], other] + dy[moved])
+
+        moved = np.flatnonzero(ok)
+        self._set_position(idx[moved], ents[moved], self.x[idx[moved], ents[moved]] + dx[moved], self.y[idx[moved], ents[moved]] + dy[moved])
+        for i in fallback:
+            ok[i] = self._move_one(int(idx[i]), int(ents[i]), int(dx[i]), int(dy[i]))
+
+        return ok
+
+    def _solids_at(self, n: int, x: int, y: int) -> list[int]:
+        cell = y * self.width + x
+        count = self.count[n, cell]
+        if count == 0:
+            return []
+
+        if count == 1:
+            return [int(self.total[n, cell])]
+
+        match = self.solid & self.active[n] & self.alive[n] & (self.x[n] == x) & (self.y[n] == y)
+        return np.flatnonzero(match).tolist()
+
+    def _move_one(self, n: int, ent: int, dx: int, dy: int) -> bool:
+        """Same as system.move for a single copy."""
+        x = int(self.x[n, ent]) + dx
+        y = int(self.y[n, ent]) + dy
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+
+        for other in self._solids_at(n, x, y):
+            if self.pushable[other]:
+                if not self.pusher[ent]:
+                    return False
+                elif not self._move_one(n, other, dx, dy):
+                    return False
+            elif ent not in self.allow[other]:
+                return False
+
+        self._set_position(np.array([n]), np.array([ent]), x, y)
+        return True
+
+    def _move_entity(self, mask, ent: int, dx, dy):
+        """Move ent by per-copy (dx, dy) in the copies where mask is True, returning the per-copy result."""
+        ok = np.zeros(self.n, dtype=bool)
+        idx = np.flatnonzero(mask)
+        if idx.size:
+            ok[idx] = self._move(idx, np.full(idx.size, ent), dx[idx], dy[idx])
+
+        return ok
+
+    def _search(self, n: int, start: tuple[int, int], goal: tuple[int, int], diagonal: bool):
+        cells = (self.count[n] == 0).tobytes()
+        key = cells, start, goal, diagonal
+        if key in _PATH_CACHE:
+            return _PATH_CACHE[key]
+
+        if len(_PATH_CACHE) >= _PATH_CACHE_SIZE:
+            _PATH_CACHE.clear()
+
+        path = _PATH_CACHE[key] = a_star.search_cells(cells, self.width, self.height, start, goal, diagonal=diagonal)
+        return path
+
+    # Systems, in World.setup_systems order
+
+    def _action_system(self, running, actions):
+        deltas = np.array([a.move_delta for a in ACTIONS], dtype=np.int64)
+        dx, dy = deltas[actions, 0], deltas[actions, 1]
+        self._move_entity(running & (actions != ACTIONS.index(Action.NONE)), self.player, dx, dy)
+
+    def _death_system(self, running):
+        running = running & ~self.finished
+        if not self.deadly_ids.size:
+            return
+
+        px, py = self.x[:, self.player], self.y[:, self.player]
+        self._kill(running & self._at(self.deadly_ids, px, py).any(axis=1))
+
+    def _door_system(self, running):
+        running = running & ~self.finished
+        for i, collector in enumerate(self.collector_ids):
+            mask = running & self.alive[:, collector] & self.active[:, collector]
+            cx, cy = self.x[:, collector], self.y[:, collector]
+            if self.key_ids.size:
+                keys = self._at(self.key_ids, cx, cy) & mask[:, None]
+                self.key_count[:, i] += keys.sum(axis=1)
+                idx, k = np.nonzero(keys)
+                self._remove(idx, self.key_ids[k])
+
+            if self.door_ids.size:
+                mask &= self.key_count[:, i] >= 1
+                for x, y in grid_neighbors((0, 0)):
+                    doors = self._at(self.door_ids, cx + x, cy + y) & mask[:, None]
+                    self.key_count[:, i] -= doors.sum(axis=1)
+                    idx, d = np.nonzero(doors)
+                    self._remove(idx, self.door_ids[d])
+
+    def _switch_system(self, running):
+        running = running & ~self.finished
+        if not self.switch_ids:
+            return
+
+        triggered = np.stack([
+            self._at(self.presser_ids, self.x[:, s], self.y[:, s], active=False).any(axis=1) & self.alive[:, s]
+            for s in self.switch_ids
+        ], axis=1)
+        was_pressable = self.pressable.copy()
+
+        for i, group in enumerate(self.switch_groups):
+            if group is not None:
+                mask = running & triggered[:, i] & was_pressable[:, i]
+                self.pressed[mask, i] = True
+                self.pressable[mask, i] = False
+                following = group[(group.index(i) + 1) % len(group)]
+                self.pressable[mask, following] = True
+                self.pressed[mask, following] = False
+                for other in group:
+                    if other not in (i, following):
+                        self.pressable[mask, other] = False
+                        self.pressed[mask, other] = False
+
+                self.pressed[running & ~mask, i] = False
+            else:
+                self.pressed[running, i] = triggered[running, i] & was_pressable[running, i]
+                self.pressable[running, i] = ~triggered[running, i]
+
+        for ent, triggers in zip(self.switchable_ids, self.switchable_triggers):
+            mask = running & self.alive[:, ent] & self.pressed[:, triggers].any(axis=1)
+            idx = np.flatnonzero(mask)
+            self._set_active(idx, np.full(idx.size, ent), ~self.active[idx, ent])
+
+    def _patrol_ai_system(self, running):
+        running = running & ~self.finished
+        change_dir = []
+        for i, ent in enumerate(self.patrol_ids):
+            mask = running & self.alive[:, ent] & self.active[:, ent]
+            dx, dy = self.patrol_delta[:, i, 0], self.patrol_delta[:, i, 1]
+            change_dir.append(mask & ~self._move_entity(mask, ent, dx, dy))
+
+        for i, ent in enumerate(self.patrol_ids):
+            mask = change_dir[i]
+            self.patrol_delta[mask, i] *= -1
+            self._move_entity(mask, ent, self.patrol_delta[:, i, 0], self.patrol_delta[:, i, 1])
+
+    def _mirror_ai_system(self, running):
+        running = running & ~self.finished
+        for ent, ai in zip(self.mirror_ids, self.mirror_ai):
+            mask = running & self.alive[:, ent] & self.active[:, ent] & self.has_delta[:, ai.target]
+            dx = -self.delta[:, ai.target, 0] if ai.mirror_x else self.delta[:, ai.target, 0]
+            dy = -self.delta[:, ai.target, 1] if ai.mirror_y else self.delta[:, ai.target, 1]
+            self._move_entity(mask, ent, dx, dy)
+
+    def _chase_ai_system(self, running):
+        running = running & ~self.finished
+        for i, (ent, ai) in enumerate(zip(self.chase_ids, self.chase_ai)):
+            mask = running & self.alive[:, ent] & self.active[:, ent]
+            self.chase_tick[mask, i] += 1
+            mask &= self.chase_tick[:, i] % ai.stagger == 0
+
+            # Per-copy steps along each path, then moved for all copies one step at a time
+            steps = np.zeros((self.n, ai.steps, 2), dtype=np.int64)
+            remain = np.zeros(self.n, dtype=np.int64)
+            for n in np.flatnonzero(mask).tolist():
+                x, y = int(self.x[n, ent]), int(self.y[n, ent])
+                goal = int(self.x[n, ai.target]), int(self.y[n, ai.target])
+                path = self._search(n, (x, y), goal, ai.diagonal)
+                for j, (x_new, y_new) in enumerate((path or [])[:ai.steps]):
+                    steps[n, j] = x_new - x, y_new - y
+                    x, y = x_new, y_new
+
+                remain[n] = j + 1 if path else 0
+
+            for j in range(ai.steps):
+                moving = remain > j
+                remain[moving & ~self._move_entity(moving, ent, steps[:, j, 0], steps[:, j, 1])] = 0
+
+    def _snake_ai_system(self, running):
+        running = running & ~self.finished
+        heads = [(e, ai) for e, ai in zip(self.snake_ids, self.snake_ai) if e == ai.head]
+        for n in np.flatnonzero(running).tolist() if heads else ():
+            for ent, ai in heads:
+                if self.alive[n, ent] and self.active[n, ent]:
+                    self._snake_one(n, ent, ai)
+
+    def _teleport_one(self, n: int, ent: int, x: int, y: int):
+        self._set_position(np.array([n]), np.array([ent]), x, y)
+
+    def _snake_one(self, n: int, ent: int, ai: SnakeAI):
+        """Same as SnakeAISystem for one snake head in a single copy."""
+        def shift(ent: int | None, x: int, y: int):
+            while ent:
+                old_x, old_y = int(self.x[n, ent]), int(self.y[n, ent])
+                self._teleport_one(n, ent, x, y)
+                x, y = old_x, old_y
+                ent = self.snake_ai[self.snake_index[ent]].next
+
+        i = self.snake_index[ent]
+        x, y = int(self.x[n, ent]), int(self.y[n, ent])
+        if not self.snake_has_delta[n, i]:
+            goal = int(self.x[n, ai.target]), int(self.y[n, ai.target])
+            path = self._search(n, (x, y), goal, ai.diagonal)
+            remain = ai.steps
+            while path and remain > 0:
+                (x_new, y_new), *path = path
+                if not self._move_one(n, ent, x_new - x, y_new - y):
+                    break
+
+                shift(ai.next, x, y)
+                remain -= 1
+                x, y = x_new, y_new
+        else:
+            dx, dy = self.snake_delta[n, i].tolist()
+            for _ in range(ai.steps):
+                x, y = int(self.x[n, ent]), int(self.y[n, ent])
+                if self._move_one(n, ent, dx, dy):
+                    shift(ai.next, x, y)
+                else:
+                    dx, dy = -dx, -dy
+                    if self._move_one(n, ent, dx, dy):
+                        shift(ai.next, x, y)
+
+            self.snake_delta[n, i] = dx, dy
+
+    def _goal_system(self, running):
+        running = running & ~self.finished
+        if not self.goal_ids.size:
+            return
+
+        px, py = self.x[:, self.player], self.y[:, self.player]
+        reached = running & self._at(self.goal_ids, px, py).any(axis=1)
+        self.goal_reached |= reached
+        self._clear_fog(reached)
+
+    def _timer_system(self, stepping):
+        if not self.timer_ids:
+            return
+
+        timer_ids = np.array(self.timer_ids, dtype=np.int64)
+        stepping = stepping & self.alive[:, timer_ids].any(axis=1)
+        resets = np.zeros(self.n, dtype=bool)
+        if self.timer_reset_ids.size:
+            px, py = self.x[:, self.player], self.y[:, self.player]
+            found = self._at(self.timer_reset_ids, px, py) & stepping[:, None]
+            idx, r = np.nonzero(found)
+            self._remove(idx, self.timer_reset_ids[r])
+            resets = found.any(axis=1)
+
+        expired = []
+        for i, ent in enumerate(self.timer_ids):
+            mask = stepping & self.alive[:, ent] & self.active[:, ent]
+            self.timer_tick[mask, i] += 1
+            self.timer_tick[mask & resets, i] = 0
+            mask &= ~resets & (self.timer_tick[:, i] >= self.timer_limit[i]) & ~self.goal_reached
+            if ent == self.player:
+                self._kill(mask)
+            else:
+                expired.append((np.flatnonzero(mask), ent))
+
+        for idx, ent in expired:
+            self._remove(idx, np.full(idx.size, ent))
+
+    # Views
+
+    def world(self, i: int) -> World:
+        """Return copy i as a World, e.g. to render it with a view pipeline."""
+        world = self._template.fork()
+        em = world.em
+        for e in range(self.num_entities):
+            if not self.alive[i, e]:
+                em.remove(e)
+                continue
+
+            position = Position(int(self.x[i, e]), int(self.y[i, e]))
+            if position != em.get(Position)[e]:
+                em.add_component(e, position)
+
+            if self.has_delta[i, e]:
+                em.add_component(e, PositionDelta(*self.delta[i, e].tolist()))
+
+            if self.active[i, e] and e not in em.get(Active):
+                em.add_component(e, Active())
+            elif not self.active[i, e] and e in em.get(Active):
+                em.remove_component(e, Active)
+
+        for j, e in enumerate(self.collector_ids):
+            if self.alive[i, e]:
+                em.get(KeyCollector)[e].count = int(self.key_count[i, j])
+
+        for j, e in enumerate(self.timer_ids):
+            if self.alive[i, e]:
+                em.get(Timer)[e].tick = int(self.timer_tick[i, j])
+
+        for j, e in enumerate(self.chase_ids):
+            em.get(ChaseAI)[e].tick = int(self.chase_tick[i, j])
+
+        for j, e in enumerate(self.patrol_ids):
+            em.get(PatrolAI)[e].delta = tuple(self.patrol_delta[i, j].tolist())
+
+        for j, e in enumerate(self.snake_ids):
+            if self.snake_has_delta[i, j]:
+                em.get(SnakeAI)[e].delta = tuple(self.snake_delta[i, j].tolist())
+
+        for j, e in enumerate(self.switch_ids):
+            switch = em.get(Switch)[e]
+            switch.pressed = bool(self.pressed[i, j])
+            switch.pressable = bool(self.pressable[i, j])
+            entity_type = Entity.SWITCH_PRESSABLE if switch.pressable else Entity.SWITCH_UNPRESSABLE
+            em.add_component(e, Identity(entity_type))
+
+        world.turn = int(self.turn[i])
+        if self.player_dead[i]:
+            world.state.player_dead = True
+
+        if self.goal_reached[i]:
+            world.state.goal_reached = True
+
+        return world
@@ -1,7 +1,7 @@
 from gridlab.action import Action
 from gridlab.difficulty import get_difficulty_score
 from gridlab.view.pipeline_builder import ViewMode, build_view_pipeline
-from gridlab.world import World
+from gridlab.world import UnsolvableError, World
 from gridlab.world_builder import create_world, world_metadata, world_names
 
 
@@ -23,8 +23,12 @@ Remain: {remain}
 {grid}"""
 
 
+NO_SOLUTION = 'No solution found!'
+
+
 class VerificationFailed(Exception):
     def __init__(self, message: str, taken: list[Action], remain: list[Action], views: dict[str, str]):
+        self.status = message
         taken_csv = ', '.join(taken)
         remain_csv = ', '.join(remain)
         message = VERIFICATION_FAILED_TEMPLATE.format(
@@ -40,22 +44,25 @@ def verify_solution(world: World | str):
     if not isinstance(world, World):
         world = create_world(world)
 
-    solution = world.solve()
-    taken = []
-    for action in solution:
-        world.step(action=action)
-        taken.append(action)
-        if world.state.is_finished:
-            break
-
-    remain = solution[len(taken):]
-    status = 'ok'
-    if not world.state.goal_reached:
-        status = 'Finished without reaching goal!'
-    elif solution != taken:
-        status = 'Finished with actions remaining!'
+    try:
+        solution = world.solve()
+    except UnsolvableError:
+        solution = None
+
+    taken: list[Action] = []
+    remain: list[Action] = []
+    if solution is None:
+        status = NO_SOLUTION
     else:
-        return True
+        rollout = world.step_many(solution)
+        taken = solution[:rollout.steps]
+        remain = solution[rollout.steps:]
+        if not world.state.goal_reached:
+            status = 'Finished without reaching goal!'
+        elif solution != taken:
+            status = 'Finished with actions remaining!'
+        else:
+            return True
 
     pipeline = build_view_pipeline(mode=ViewMode.TEXT)
     views = pipeline.render(world)
@@ -69,10 +76,8 @@ def verify_all_solutions() -> dict[str, tuple[bool, str]]:
     for name in names:
         try:
             verify_solution(world=name)
-        except NotImplementedError:
-            results[name] = False, 'Solve not implemented'
-        except VerificationFailed:
-            results[name] = False, 'Invalid solution'
+        except VerificationFailed as e:
+            results[name] = False, 'No solution' if e.status == NO_SOLUTION else 'Invalid solution'
         except Exception as e:
             results[name] = False, f'Unexpected error {type(e).__name__}("{e}")'
         else:
@@ -1,5 +1,8 @@
+import functools
+from typing import Sequence
+
 from gridlab.component import Active, Identity, Position
-from gridlab.entity import Entity
+from gridlab.entity import ENTITY_CODES, Entity
 from gridlab.view import terminal_style
 from gridlab.view.base import View
 from gridlab.view.theme import Symbol, Theme
@@ -30,6 +33,64 @@ def _create_render_order_map():
 
 RENDER_PRIORITY = _create_render_order_map()
 
+EMPTY_CODE = ENTITY_CODES[Entity.EMPTY]
+
+# Render priority of each entity code, -1 for empty cells
+_CODE_PRIORITY = [RENDER_PRIORITY.get(e, -1) for e in Entity]
+
+
+@functools.cache
+def _empty_cells(size: int) -> bytes:
+    return bytes([EMPTY_CODE]) * size
+
+
+def write_entity_codes(world: World, out, offset: int = 0):
+    """Write the code (index in list(Entity)) of the entity drawn on each cell into out, row by row.
+
+    Cells are resolved as TextGridView draws them, so fog hides what it covers. They are written to
+    cells offset to offset + width * height of out, which may be any writable C-contiguous buffer of
+    bytes: a bytearray, shared memory or a uint8 NumPy array of any shape. Nothing is allocated
+    besides the buffer's memoryview.
+    """
+    width, height = world.grid.width, world.grid.height
+    size = width * height
+    em = world.em
+    id_map = em.get(Identity)
+    pos_map = em.get(Position)
+    priority = _CODE_PRIORITY
+
+    with memoryview(out) as buffer, buffer.cast('B') as cells:
+        if offset < 0 or offset + size > len(cells):
+            raise ValueError(f'buffer of {len(cells)} bytes too small for cells {offset} to {offset + size}')
+
+        cells[offset:offset + size] = _empty_cells(size)
+        for e in em.query(Identity, Position, Active):
+            p = pos_map[e]
+            code = ENTITY_CODES[id_map[e].type]
+            i = offset + p.y * width + p.x
+            if priority[code] >= priority[cells[i]]:
+                cells[i] = code
+
+
+def write_entity_codes_batch(worlds: Sequence[World], out):
+    """Write the entity codes of each world into consecutive slots of out, e.g. a uint8 array shaped (n, height, width).
+
+    The worlds must share the same grid size.
+    """
+    if not worlds:
+        return
+
+    size = worlds[0].grid.width * worlds[0].grid.height
+    with memoryview(out) as buffer, buffer.cast('B') as cells:
+        if len(cells) < len(worlds) * size:
+            raise ValueError(f'buffer of {len(cells)} bytes too small for {len(worlds)} worlds of {size} cells')
+
+        for i, world in enumerate(worlds):
+            if world.grid.width * world.grid.height != size:
+                raise ValueError('worlds have different grid sizes')
+
+            write_entity_codes(world, cells, i * size)
+
 
 class TextGridView(View):
     def entity_symbol_grid(self, world: World, theme: Theme) -> list[list[tuple[Entity, Symbol]]]:
@@ -1,5 +1,8 @@
+import copy
+import dataclasses
 import string
-from typing import Callable
+from enum import StrEnum
+from typing import Callable, Iterable, NamedTuple, Type
 
 from gridlab import component, system
 from gridlab.action import Action
@@ -7,7 +10,30 @@ from gridlab.difficulty import Difficulty
 from gridlab.entity import Entity, EntityManager
 from gridlab.grid import Grid
 from gridlab.layer import Layer
+from gridlab.passability import PassabilityMap
+from gridlab.pathfinding import Pathfinding
 from gridlab.state import State
+from gridlab.state_codec import StateCodec
+from gridlab.transition_cache import TransitionCache, apply_transition, record_transition, save_fields
+from gridlab.zobrist import ZobristHash
+
+
+class UnsolvableError(ValueError):
+    """Raised by World.solve when no sequence of moves reaches the goal."""
+
+
+class StepRecord(StrEnum):
+    HASH = 'hash'
+    FRAME = 'frame'
+    STATE = 'state'
+
+
+class Rollout(NamedTuple):
+    """Result of World.step_many: how many actions were applied, the final flags and any records."""
+    steps: int
+    goal_reached: bool
+    player_dead: bool
+    records: list[int | bytes]
 
 
 class World:
@@ -16,6 +42,10 @@ class World:
     difficulty: Difficulty = Difficulty.UNCLASSIFIED
     entity_types: list[Entity] = []
 
+    # Storage
+    entity_manager_class: Type[EntityManager] = EntityManager
+    recycle_entity_ids: bool = False
+
     # State
     state: State
     em: EntityManager
@@ -23,7 +53,16 @@ class World:
 
     # Private
     _grid: Grid | None
+    _passability: PassabilityMap | None
+    _zobrist: ZobristHash | None
+    _state_codec: StateCodec | None
+    _history: list[tuple[int, int, tuple[bool, bool, bool], list[tuple[object, dict]]]] | None
+    _transition_cache: TransitionCache | None
+    _deadlocks: object | None  # gridlab.deadlock.DeadlockDetector, shared with forks
+    _solutions: dict[bytes, list[Action] | None]  # encoded state -> search result, shared with forks
     _systems: list[Callable[[], None]] | None
+    _schedule: list[bool] | None
+    _schedule_size: int
     _action_system: system.ActionSystem | None
     _player: int | None
 
@@ -35,8 +74,33 @@ class World:
         raise NotImplementedError()
 
     def solve(self) -> list[Action]:
-        """Return the list of moves that result in success."""
-        raise NotImplementedError()
+        """Return the list of moves that result in success.
+
+        Unless overridden with a known solution, a shortest one is searched for from the current
+        state with gridlab.solver; UnsolvableError is raised if the search finds none. Search
+        results are cached per state and shared with forks, so solving a state again is free.
+        """
+        from gridlab import solver  # deferred, gridlab.solver imports this module
+
+        key = self.encode()
+        if key not in self._solutions:
+            self._solutions[key] = solver.solve(self).actions
+
+        actions = self._solutions[key]
+        if actions is None:
+            raise UnsolvableError(f'no solution found for {self.name}')
+
+        return list(actions)
+
+    def known_solution(self) -> list[Action] | None:
+        """Return what solve() would for the current state if that needs no search, else None."""
+        if type(self).solve is not World.solve:
+            try:
+                return self.solve()
+            except UnsolvableError:
+                return None
+
+        return self._solutions.get(self.encode())
 
     @property
     def grid(self):
@@ -45,6 +109,44 @@ class World:
 
         return self._grid
 
+    @property
+    def passability(self):
+        if self._passability is None:
+            raise ValueError('passability not set!')
+
+        return self._passability
+
+    @property
+    def state_hash(self) -> int:
+        """64-bit hash of the entities and their components, maintained incrementally once first read."""
+        if self._zobrist is None:
+            self._zobrist = ZobristHash(self.em, mutable=component.MUTABLE_COMPONENTS)
+
+        return self._zobrist.value
+
+    @property
+    def state_codec(self) -> StateCodec:
+        """Codec for the world's changeable state, compiled once the world is built and shared with forks."""
+        if self._state_codec is None:
+            raise ValueError('state_codec not set!')
+
+        return self._state_codec
+
+    def encode(self) -> bytes:
+        """Compact canonical encoding of the world's changeable state, see StateCodec."""
+        return self.state_codec.encode(self.em, self.state)
+
+    def decode(self, data: bytes):
+        """Set the world to a state returned by encode() on this world or a fork of it.
+
+        Entities removed since (such as collected keys) cannot be brought back, so decode into a
+        fork of the world in an earlier state, such as its initial one. Undo history is not kept
+        across the change.
+        """
+        self.state_codec.decode_into(data, self.em, self.state)
+        if self._history is not None:
+            self._history.clear()
+
     @property
     def systems(self):
         if self._systems is None:
@@ -77,15 +179,93 @@ class World:
 
     def reset(self):
         self.state = State()
-        self.em = EntityManager()
+        self.em = self.entity_manager_class(recycle_ids=self.recycle_entity_ids)
         self.turn = 1
         self._grid = None
+        self._passability = None
+        self._zobrist = None
+        self._state_codec = None
+        self._history = None
+        self._transition_cache = None
+        self._deadlocks = None
+        self._solutions = {}
         self._systems = None
+        self._schedule = None
+        self._schedule_size = -1
         self._action_system = None
         self._player = None
         self.build()
+        self._state_codec = StateCodec(self.em)
         self.setup_systems()
 
+    def fork(self) -> 'World':
+        """Return an independent copy of the world in its current state.
+
+        The grid is shared with the copy, as are components that are never updated in place,
+        so forking copies the component maps rather than rebuilding the world.
+        Systems and state callbacks are set up again for the copy.
+        """
+        world = copy.copy(self)
+        world.state = dataclasses.replace(self.state, player_dead_callbacks=[], goal_reached_callbacks=[])
+        world.em = self.em.fork(copy_types=component.MUTABLE_COMPONENTS)
+        world._passability = self.passability.fork(world.em)
+        if self._zobrist is not None:
+            world._zobrist = self._zobrist.fork(world.em)
+
+        if self._history is not None:
+            world._history = []
+
+        world.setup_systems()
+        return world
+
+    def enable_undo(self):
+        """Record the changes made by each step from now on so they can be reverted with undo()."""
+        if self._history is None:
+            self._history = []
+            self.em.start_journal()
+
+    def undo(self) -> bool:
+        """Revert the most recent step, returning False if there is no recorded step to revert."""
+        if not self._history:
+            return False
+
+        mark, turn, flags, saved = self._history.pop()
+        self.em.rollback(mark)
+        for c, fields in saved:
+            vars(c).update(fields)
+
+        self.state.set_flags(flags)
+        self.turn = turn
+        return True
+
+    @property
+    def transition_cache(self) -> TransitionCache | None:
+        return self._transition_cache
+
+    def enable_transition_cache(self, maxsize: int = 4096) -> TransitionCache:
+        """Cache the changes made by each step, keyed by state hash and actions, and replay them when repeated.
+
+        The cache is shared with forks made from now on. Replayed steps restore the state flags
+        without invoking state callbacks.
+        """
+        if self._transition_cache is None:
+            self._transition_cache = TransitionCache(maxsize)
+
+        return self._transition_cache
+
+    def is_deadlocked(self) -> bool:
+        """Whether pushed blocks have frozen in place so that the player can no longer reach a goal.
+
+        The walls and goals are analysed the first time this is called, and the analysis is shared
+        with forks made from then on. See gridlab.deadlock.DeadlockDetector.
+        """
+        if self._deadlocks is None:
+            from gridlab.deadlock import DeadlockDetector  # deferred, gridlab.deadlock imports this module
+
+            self._deadlocks = DeadlockDetector(self)
+
+        return self._deadlocks.is_deadlocked(self)
+
     def step(
             self,
             *,
@@ -95,21 +275,101 @@ class World:
         if self.state.is_finished:
             return False
 
+        self._record_history()
         actions = actions or []
         if action is not None:
             actions = [(self.player, action), *actions]
 
-        actions = [(e, Action(a)) for e, a in actions]
+        self._advance([(e, Action(a)) for e, a in actions])
+
+    def step_many(self, actions: Iterable[Action | str], *, record: StepRecord | str | None = None) -> Rollout:
+        """Step the player through actions, stopping once the world is finished.
+
+        Every action is validated before the first step runs. With `record`, the state hash
+        (StepRecord.HASH), entity-code frame (StepRecord.FRAME, see write_entity_codes) or
+        encoded state (StepRecord.STATE, see encode) after each step is collected in the
+        result's records.
+        """
+        actions = [Action(a) for a in actions]
+        record = None if record is None else StepRecord(record)
+        if record == StepRecord.FRAME:
+            from gridlab.view.grid import write_entity_codes  # deferred, gridlab.view.grid imports this module
+
+        records: list[int | bytes] = []
+        size = self.grid.width * self.grid.height
+        player = self.player
+        steps = 0
+        for action in actions:
+            if self.state.is_finished:
+                break
+
+            self._record_history()
+            self._advance([(player, action)])
+            steps += 1
+            if record == StepRecord.HASH:
+                records.append(self.state_hash)
+            elif record == StepRecord.FRAME:
+                frame = bytearray(size)
+                write_entity_codes(self, frame)
+                records.append(bytes(frame))
+            elif record == StepRecord.STATE:
+                records.append(self.encode())
+
+        return Rollout(steps, self.state.goal_reached, self.state.player_dead, records)
+
+    def _record_history(self):
+        if self._history is not None:
+            # Components updated in place are not journaled by the entity manager, so save their fields
+            saved = [(c, vars(c).copy()) for t in component.MUTABLE_COMPONENTS for c in self.em.get(t).values()]
+            self._history.append((self.em.journal_mark(), self.turn, self.state.get_flags(), saved))
+
+    def _advance(self, actions: list[tuple[int, Action]]):
+        """Run one step of the systems (or replay it from the transition cache) for validated actions."""
+        cache = self._transition_cache
+        if cache is not None:
+            key = self.state_hash, tuple(actions)
+            transition = cache.get(key)
+            if transition is not None:
+                apply_transition(self.em, transition, component.MUTABLE_COMPONENTS)
+                self.state.set_flags(transition.flags)
+                self.turn += 1
+                return
+
+            started_here = not self.em.journaling
+            self.em.start_journal()
+            mark = self.em.journal_mark()
+            fields = save_fields(self.em, component.MUTABLE_COMPONENTS)
+
         self.action_system.add_actions(actions)
-        for s in self.systems:
-            s()
+        component_types = self.em.component_types()
+        for i, s in enumerate(self.systems):
+            # Component types are never dropped, so a change in their number means a new type appeared
+            if len(component_types) != self._schedule_size:
+                self.compile_schedule()
+
+            if self._schedule[i]:
+                s()
+
+        if cache is not None:
+            transition = record_transition(self.em, mark, fields, component.MUTABLE_COMPONENTS, self.state.get_flags())
+            cache.put(key, transition)
+            if started_here:
+                self.em.stop_journal()
 
         self.turn += 1
 
+    def compile_schedule(self):
+        """Enable only the systems for which one of their `requires` component types has been added."""
+        component_types = self.em.component_types()
+        self._schedule = [
+            not getattr(s, 'requires', ()) or any(t in component_types for t in s.requires)
+            for s in self.systems
+        ]
+        self._schedule_size = len(component_types)
+
     def setup_systems(self):
         def clear_fog():
-            fog = self.em.get(component.Fog)
-            self.em.remove_all(list(fog.keys()))
+            self.em.remove_where(component.Fog)
 
         def on_player_death():
             clear_fog()
@@ -131,12 +391,15 @@ class World:
 
         self.state.goal_reached_callbacks.append(on_goal_reached)
 
+        if self._passability is None:  # already set when forking
+            self._passability = PassabilityMap(self.em, self.grid)
+
         action_system = system.ActionSystem(self.em, self.state, grid=self.grid)
 
         patrol_ai_system = system.PatrolAISystem(self.em, self.state, grid=self.grid)
         mirror_ai_system = system.MirrorAISystem(self.em, self.state, grid=self.grid)
-        chase_ai_system = system.ChaseAISystem(self.em, self.state, grid=self.grid)
-        snake_ai_system = system.SnakeAISystem(self.em, self.state, grid=self.grid)
+        chase_ai_system = system.ChaseAISystem(self.em, self.state, grid=self.grid, passability=self.passability)
+        snake_ai_system = system.SnakeAISystem(self.em, self.state, grid=self.grid, passability=self.passability)
 
         position_delta_system = system.PositionDeltaSystem(self.em, self.state)
         death_system = system.DeathSystem(self.em, self.state, player=self.player)
@@ -160,6 +423,7 @@ class World:
             goal_system,
             timer_system,
         ]
+        self._schedule_size = -1  # compiled on the next step
 
     def add_player(self, x: int, y: int) -> int:
         """Add the player at the given position and return its id."""
@@ -303,10 +567,13 @@ class World:
             stagger: int = 1,
             tick: int = 0,
             diagonal: bool = False,
+            pathfinding: Pathfinding = Pathfinding.A_STAR,
     ) -> int:
         """Add a enemy at the given position that moves toward the player and return its id.
 
         Chase enemies move toward the player at each step using the A* algorithm.
+        Pathfinding FLOW_FIELD shares one distance field to the player per tick and takes the same path as A*.
+        Pathfinding INCREMENTAL repairs a search tree kept between moves and takes the same path as A*.
         """
         assert Entity.ENEMY in self.entity_types, 'missing ENEMY'
 
@@ -324,6 +591,7 @@ class World:
                 stagger=stagger,
                 tick=tick,
                 diagonal=diagonal,
+                pathfinding=pathfinding,
             ),
         )
         return e
@@ -380,7 +648,8 @@ class World:
     def add_snake_enemy(
             self,
             positions: tuple[tuple[int, int], ...],
-            delta: tuple[int, int] | None = None
+            delta: tuple[int, int] | None = None,
+            pathfinding: Pathfinding = Pathfinding.A_STAR,
     ) -> tuple[int, ...]:
         """Add multiple enemies that move as if connected and return their ids."""
         assert Entity.ENEMY in self.entity_types, 'missing ENEMY'
@@ -395,7 +664,16 @@ class World:
             self.em.add_component(e, component.Position(x, y))
             self.em.add_component(e, component.Solid(allow=(self.player,)))
             self.em.add_component(e, component.Deadly())
-            self.em.add_component(e, component.SnakeAI(target=self.player, head=head, next=next, delta=delta))
+            self.em.add_component(
+                e,
+                component.SnakeAI(
+                    target=self.player,
+                    head=head,
+                    next=next,
+                    delta=delta,
+                    pathfinding=pathfinding,
+                ),
+            )
 
         return tuple(entities)
 
@@ -26,12 +26,8 @@ def world_metadata(world: str | World) -> WorldMetadata:
         world = create_world(world)
 
     difficulty_score = get_difficulty_score(world.difficulty)
-    try:
-        solution = world.solve()
-    except NotImplementedError:
-        solution_length = None
-    else:
-        solution_length = len(solution)
+    solution = world.known_solution()  # no search, which can take a while
+    solution_length = None if solution is None else len(solution)
 
     return {
         'name': world.name,
@@ -693,9 +689,6 @@ class SwitchMediumWorld(World):
             Action.LEFT,
             Action.LEFT,
             Action.LEFT,
-            Action.DOWN,
-            Action.UP,
-            Action.LEFT,
             Action.LEFT,
             Action.LEFT,
             Action.LEFT,
@@ -703,28 +696,11 @@ class SwitchMediumWorld(World):
             Action.LEFT,
             Action.LEFT,
             Action.LEFT,
-            Action.UP,
-            Action.LEFT,
-            Action.LEFT,
             Action.DOWN,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.LEFT,
-            Action.UP,
-            Action.UP,
             Action.DOWN,
-            Action.RIGHT,
-            Action.LEFT,
             Action.LEFT,
-            Action.UP,
-            Action.UP,
-            Action.DOWN,
             Action.DOWN,
             Action.RIGHT,
-            Action.UP,
-            Action.DOWN,
-            Action.DOWN,
             Action.RIGHT,
             Action.RIGHT,
             Action.RIGHT,
@@ -734,31 +710,7 @@ class SwitchMediumWorld(World):
             Action.RIGHT,
             Action.RIGHT,
             Action.DOWN,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.LEFT,
-            Action.DOWN,
-            Action.DOWN,
-            Action.DOWN,
-            Action.DOWN,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
             Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.RIGHT,
-            Action.DOWN,
         ]
 
 
@@ -1314,9 +1266,6 @@ class ChaseWorld_02(World):
         }
         self.populate(text=text, initializers=initializers)
 
-    def solve(self):
-        raise NotImplementedError()
-
 
 @register_world
 class ChaseWorld_03(World):
@@ -1348,6 +1297,3 @@ class ChaseWorld_03(World):
             'e': self.add_chase_enemy
         }
         self.populate(text=text, initializers=initializers)
-
-    def solve(self):
-        raise NotImplementedError()
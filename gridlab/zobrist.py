@@ -0,0 +1,105 @@
+import dataclasses
+import functools
+import hashlib
+import operator
+from typing import Any, Callable, Container
+
+from gridlab.entity import EntityManager
+
+
+def _freeze(value: Any):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+
+    return value
+
+
+@functools.cache
+def _field_getter(component_type: type) -> Callable[[Any], tuple]:
+    names = [f.name for f in dataclasses.fields(component_type)]
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+
+    getters = [operator.attrgetter(name) for name in names]
+    return lambda component: tuple(g(component) for g in getters)
+
+
+@functools.lru_cache(maxsize=1 << 20)
+def zobrist_key(feature: tuple) -> int:
+    """Random-looking 64-bit key for a feature, stable across processes (unlike hash())."""
+    digest = hashlib.blake2b(repr(feature).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def component_key(ent: int, component_type: type, component) -> int:
+    values = _field_getter(component_type)(component)
+    try:
+        return zobrist_key((ent, component_type.__name__, values))
+    except TypeError:
+        # Unhashable field values (lists) are keyed as tuples
+        return zobrist_key((ent, component_type.__name__, _freeze(values)))
+
+
+class ZobristHash:
+    """64-bit hash of every component held by the entity manager, kept up to date incrementally.
+
+    The hash is the XOR of one key per (entity, component, field values), updated from the entity
+    manager's component callbacks. Components of the `mutable` types are updated in place by
+    systems rather than replaced, so their keys are refreshed whenever the value is read.
+    """
+
+    def __init__(self, em: EntityManager, mutable: Container[type] = ()):
+        self.em = em
+        self.mutable = mutable
+        self._hash = 0
+        self._mutable_keys: dict[tuple[int, type], int] = {}  # key last folded in for each mutable component
+
+        for component_type in em.component_types():
+            for ent, component in em.get(component_type).items():
+                self._add(ent, component_type, component)
+
+        em.component_callbacks.append(self.on_component_changed)
+
+    def fork(self, em: EntityManager) -> 'ZobristHash':
+        """Return a hash for `em`, a fork of this hash's entity manager, without rehashing every component."""
+        zobrist = object.__new__(ZobristHash)
+        zobrist.em = em
+        zobrist.mutable = self.mutable
+        zobrist._hash = self._hash
+        zobrist._mutable_keys = self._mutable_keys.copy()
+        em.component_callbacks.append(zobrist.on_component_changed)
+        return zobrist
+
+    def close(self):
+        self.em.component_callbacks.remove(self.on_component_changed)
+
+    @property
+    def value(self) -> int:
+        get = self.em.get
+        for (ent, component_type), key in self._mutable_keys.items():
+            new_key = component_key(ent, component_type, get(component_type)[ent])
+            if new_key != key:
+                self._hash ^= key ^ new_key
+                self._mutable_keys[ent, component_type] = new_key
+
+        return self._hash
+
+    def _add(self, ent: int, component_type: type, component):
+        key = component_key(ent, component_type, component)
+        self._hash ^= key
+        if component_type in self.mutable:
+            self._mutable_keys[ent, component_type] = key
+
+    def _remove(self, ent: int, component_type: type, component):
+        if component_type in self.mutable:
+            # The removed instance may have been changed since its key was folded in
+            self._hash ^= self._mutable_keys.pop((ent, component_type))
+        else:
+            self._hash ^= component_key(ent, component_type, component)
+
+    def on_component_changed(self, ent: int, component_type: type, old, new):
+        if old is not None:
+            self._remove(ent, component_type, old)
+
+        if new is not None:
+            self._add(ent, component_type, new)
@@ -0,0 +1,29 @@
+import random
+
+import pytest
+
+from gridlab.action import Action
+
+ACTIONS = list(Action)
+
+
+def snapshot(world) -> str:
+    """Every component's fields and the state flags, independent of dict order."""
+    components = []
+    for component_type in world.em.component_types():
+        component_map = world.em.get(component_type)
+        items = sorted((e, repr(sorted((k, repr(v)) for k, v in vars(c).items()))) for e, c in component_map.items())
+        if items:
+            components.append((component_type.__name__, items))
+
+    return repr(sorted(components)) + repr(world.state.get_flags())
+
+
+def random_actions(seed: int, n: int) -> list[Action]:
+    rng = random.Random(seed)
+    return [rng.choice(ACTIONS) for _ in range(n)]
+
+
+@pytest.fixture
+def rng():
+    return random.Random(0)
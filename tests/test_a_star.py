@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import gridlab
+from gridlab import a_star
+from gridlab.component import Position
+
+
+def random_grid(rng: random.Random, width: int, height: int, wall_ratio: float) -> list[list[bool]]:
+    return [[rng.random() >= wall_ratio for _ in range(width)] for _ in range(height)]
+
+
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('fallback', [False, True])
+@pytest.mark.parametrize('width,height', [(1, 7), (9, 6), (16, 16)])
+def test_search_cells_matches_search(width, height, diagonal, fallback):
+    rng = random.Random(width * height)
+    for wall_ratio in (0.0, 0.2, 0.4):
+        for _ in range(30):
+            grid = random_grid(rng, width, height, wall_ratio)
+            cells = [passable for row in grid for passable in row]
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            if start == goal:
+                assert a_star.search_cells(cells, width, height, start, goal) is None
+                continue  # search raises KeyError here
+
+            expected = a_star.search(grid, start, goal, diagonal=diagonal, fallback=fallback)
+            path = a_star.search_cells(cells, width, height, start, goal, diagonal=diagonal, fallback=fallback)
+            assert path == expected
+
+
+def test_engine_is_reused_across_grids():
+    engine = a_star.get_search_engine(5, 5)
+    assert a_star.get_search_engine(5, 5) is engine
+
+    walled = [[True] * 5 for _ in range(5)]
+    for y in range(5):
+        walled[y][2] = False
+
+    cells = [passable for row in walled for passable in row]
+    open_cells = [True] * 25
+    # Costs and parents left behind by one search must not leak into the next
+    for _ in range(3):
+        assert engine.search(open_cells, (0, 2), (4, 2)) == a_star.search([[True] * 5] * 5, (0, 2), (4, 2))
+        assert engine.search(cells, (0, 2), (4, 2)) is None
+        assert engine.search(cells, (0, 2), (4, 2), fallback=True) == [(1, 2)]
+
+
+def test_passability_cells():
+    world = gridlab.create_world('chase')
+    passability = world.passability
+    rows = [[bool(passable) for passable in row] for row in passability.rows]
+    position = world.em.get(Position)[world.player]
+    start = (position.x, position.y)
+    for goal in [(x, y) for y in range(passability.height) for x in range(passability.width)]:
+        if goal != start:
+            path = a_star.search_cells(passability.cells, passability.width, passability.height, start, goal)
+            assert path == a_star.search(rows, start, goal)
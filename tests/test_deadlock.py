@@ -0,0 +1,55 @@
+import pytest
+
+import gridlab
+from gridlab import component
+from gridlab.entity import Entity
+from gridlab.solver import solve
+
+
+class CorridorWorld(gridlab.World):
+    """Pushing the block twice wedges it on the goal at the end of the corridor."""
+    name = 'corridor'
+    entity_types = [Entity.PLAYER, Entity.GOAL, Entity.WALL, Entity.BLOCK]
+    block_components: tuple = ()
+
+    def build(self):
+        self.populate(
+            text="""
+            ######
+            #@0.X#
+            ######
+            """,
+            initializers={'.': None, '#': self.add_wall, '@': self.add_player, 'X': self.add_goal, '0': self.add_block},
+        )
+        for ent in self.em.get(component.Pushable):
+            for c in self.block_components:
+                self.em.add_component(ent, c)
+
+
+def changing_corridor(block_component):
+    return type('ChangingCorridorWorld', (CorridorWorld,), {'block_components': (block_component,)})()
+
+
+def push_twice(world):
+    world.step(action='right')
+    assert not world.is_deadlocked()
+    world.step(action='right')
+    return world
+
+
+def test_block_wedged_on_the_goal_is_a_deadlock():
+    assert push_twice(CorridorWorld()).is_deadlocked()
+
+    result = solve(CorridorWorld())
+    unpruned = solve(changing_corridor(component.Switchable(triggers=[])))
+    assert result.actions is None and result.exhausted
+    assert result.nodes < unpruned.nodes
+
+
+@pytest.mark.parametrize('block_component', [
+    component.Switchable(triggers=[]),
+    component.Timer(limit=5),
+    component.Key(),
+])
+def test_blocks_that_can_change_never_freeze(block_component):
+    assert not push_twice(changing_corridor(block_component)).is_deadlocked()
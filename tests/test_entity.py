@@ -0,0 +1,338 @@
+import random
+
+import pytest
+
+import gridlab
+from gridlab.component import Active, Deadly, Identity, Key, Position, PositionDelta, Solid
+from gridlab.entity import Entity, EntityManager
+from gridlab.persistent import PersistentEntityManager
+
+from conftest import random_actions, snapshot
+
+COMPONENT_TYPES = [Position, PositionDelta, Active, Solid, Deadly, Identity, Key]
+GRID = 4
+
+
+def make_em() -> EntityManager:
+    em = EntityManager()
+    for x in range(3):
+        e = em.create()
+        em.add_component(e, Position(x, 0))
+        em.add_component(e, Active())
+        if x != 1:
+            em.add_component(e, Solid())
+
+    return em
+
+
+def test_at_follows_position_changes():
+    em = make_em()
+    assert em.at(1, 0) == [1]
+    em.add_component(1, Position(2, 0))
+    assert sorted(em.at(2, 0)) == [1, 2]
+    assert not em.at(1, 0)
+    assert em.at(2, 0, with_=Solid) == [2]
+
+
+def test_query_cache_is_invalidated():
+    em = make_em()
+    assert list(em.query(Solid, Position)) == [0, 2]
+    em.remove_component(0, Solid)
+    assert list(em.query(Solid, Position)) == [2]
+    em.remove(2)
+    assert not em.query(Solid, Position)
+
+
+def test_query_cache_is_invalidated_through_each_type():
+    em = make_em()
+    assert list(em.query(Solid, Position)) == [0, 2]
+    em.add_component(1, Solid())  # drops the cached query through Solid
+    assert list(em.query(Solid, Position)) == [0, 1, 2]
+    em.remove_component(2, Position)  # and the query cached again through Position
+    assert list(em.query(Solid, Position)) == [0, 1]
+    fork = em.fork()
+    fork.remove_component(0, Solid)
+    assert list(fork.query(Solid, Position)) == [1]
+    assert list(em.query(Solid, Position)) == [0, 1]
+
+
+def test_rollback_restores_components_and_entities():
+    em = make_em()
+    em.start_journal()
+    mark = em.journal_mark()
+    em.add_component(0, Position(5, 5))
+    em.remove(2)
+    e = em.create()
+    em.add_component(e, Position(1, 1))
+    em.rollback(mark)
+
+    assert em.get(Position)[0] == Position(0, 0)
+    assert em.is_alive(2) and em.get(Position)[2] == Position(2, 0)
+    assert not em.is_alive(e)
+    assert em.at(1, 1) == []
+    assert em.create() == e  # the id handed out again
+
+
+def test_component_types_outlive_their_entities():
+    em = make_em()
+    component_types = em.component_types()
+    assert set(component_types) == {Position, Active, Solid}
+    em.add_component(em.create(), Key())
+    em.remove_where(Key)
+    assert Key in component_types and not em.get(Key)
+
+
+def test_journal_since():
+    em = make_em()
+    with pytest.raises(ValueError):
+        em.journal_since(0)
+
+    em.start_journal()
+    em.add_component(0, Position(5, 5))
+    mark = em.journal_mark()
+    e = em.create()
+    em.add_component(e, Solid())
+    em.remove(1)
+    assert em.journal_since(mark) == [
+        ('create', e, False),
+        ('component', e, Solid, None),
+        ('component', 1, Position, Position(1, 0)),
+        ('component', 1, Active, Active()),
+        ('remove', 1),
+    ]
+    assert em.journal_since(em.journal_mark()) == []
+
+
+def test_fork_is_isolated():
+    em = make_em()
+    fork = em.fork()
+    fork.add_component(0, Position(9, 9))
+    fork.remove(1)
+
+    assert em.get(Position)[0] == Position(0, 0)
+    assert em.is_alive(1) and em.at(1, 0) == [1]
+    assert not fork.is_alive(1)
+
+
+def test_remove_notifies_each_held_component_once():
+    em = make_em()
+    em.remove_component(0, Solid)
+    events = []
+    em.component_callbacks.append(lambda ent, component_type, old, new: events.append((ent, component_type, new)))
+    em.remove(0)
+    assert sorted(events, key=repr) == sorted([(0, Position, None), (0, Active, None)], key=repr)
+    assert not em.is_alive(0) and all(0 not in em.get(t) for t in (Position, Active, Solid))
+
+
+def test_remove_where():
+    em = make_em()
+    assert em.remove_where(Position, lambda p: p.x > 0) == [1, 2]
+    assert [e for e in range(3) if em.is_alive(e)] == [0]
+    assert em.at(1, 0) == [] and em.at(2, 0) == []
+    assert em.remove_where(Solid) == [0]
+    assert not em.get(Position) and not em.query(Active)
+    em.remove_all([em.create(), 3, 3])
+    assert not em.is_alive(3)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_ops_keep_removed_entities_clear(seed):
+    apply_random_ops([EntityManager()], seed)
+
+
+def random_component(rng: random.Random):
+    component_type = rng.choice(COMPONENT_TYPES)
+    if component_type is Position:
+        return Position(rng.randrange(GRID), rng.randrange(GRID))
+
+    if component_type is PositionDelta:
+        return PositionDelta(rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+
+    if component_type is Identity:
+        return Identity(rng.choice(list(Entity)))
+
+    return component_type()
+
+
+def observe(em: EntityManager, created: list[int]) -> tuple:
+    """Everything callers read back from a manager: entities, components, queries and cells."""
+    return (
+        [e for e in created if em.is_alive(e)],
+        [sorted(em.get(t).items()) for t in COMPONENT_TYPES],
+        [list(em.query(*types)) for types in ((Position,), (Position, Solid), (Identity, Key), (Deadly, Position))],
+        list(em.query(Identity, active=True)),
+        [em.at(x, y) for y in range(GRID) for x in range(GRID)],
+        [em.at(x, y, with_=Solid, active=True) for y in range(GRID) for x in range(GRID)],
+    )
+
+
+def apply_random_ops(ems: list[EntityManager], seed: int, steps: int = 300, created: list[int] | None = None) -> list[int]:
+    """Apply the same seeded creations, removals and component changes to every manager, comparing them after each.
+
+    Returns the entities created, appended to `created` if given.
+    """
+    rng = random.Random(seed)
+    created = [] if created is None else created
+    for _ in range(steps):
+        alive = [e for e in created if ems[0].is_alive(e)]
+        op = rng.random()
+        if op < 0.15 or not alive:
+            ids = {em.create() for em in ems}
+            assert len(ids) == 1
+            ent = ids.pop()
+            if ent not in created:
+                created.append(ent)
+        elif op < 0.25:
+            ent = rng.choice(alive)
+            for em in ems:
+                em.remove(ent)
+        elif op < 0.3:
+            component_type = rng.choice(COMPONENT_TYPES)
+            column = rng.randrange(GRID)
+            predicate = (lambda p: p.x == column) if component_type is Position else None
+            removed = [sorted(em.remove_where(component_type, predicate)) for em in ems]
+            assert all(r == removed[0] for r in removed)
+        elif op < 0.8:
+            ent, component = rng.choice(alive), random_component(rng)
+            for em in ems:
+                em.add_component(ent, component)
+        else:
+            ent = rng.choice(alive)
+            held = [t for t in COMPONENT_TYPES if ent in ems[0].get(t)]
+            if held:
+                component_type = rng.choice(held)
+                for em in ems:
+                    em.remove_component(ent, component_type)
+
+        expected = observe(ems[0], created)
+        for em in ems[1:]:
+            assert observe(em, created) == expected
+
+        removed = [e for e in created if not ems[0].is_alive(e)]
+        assert not any(e in ems[0].get(t) for t in COMPONENT_TYPES for e in removed)
+
+    return created
+
+
+def with_entity_manager(name: str, entity_manager_class: type) -> gridlab.World:
+    world_class = type(gridlab.create_world(name))
+    return type(world_class.__name__, (world_class,), {'entity_manager_class': entity_manager_class})()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_array_entity_manager_matches_dict_backend(seed):
+    pytest.importorskip('numpy')
+    from gridlab.storage import ArrayEntityManager
+
+    apply_random_ops([EntityManager(), ArrayEntityManager(capacity=4)], seed)
+
+
+@pytest.mark.parametrize('name', ['demo', 'switch-trick-world', 'door', 'snake', 'chase-push'])
+def test_world_steps_the_same_on_array_storage(name):
+    pytest.importorskip('numpy')
+    from gridlab.storage import ArrayEntityManager
+
+    world = gridlab.create_world(name)
+    array_world = with_entity_manager(name, ArrayEntityManager)
+    assert snapshot(array_world) == snapshot(world)
+    for action in random_actions(9, 40):
+        world.step(action=action)
+        array_world.step(action=action)
+        assert snapshot(array_world) == snapshot(world)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_persistent_entity_manager_matches_dict_backend(seed):
+    apply_random_ops([EntityManager(recycle_ids=True), PersistentEntityManager(recycle_ids=True)], seed)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_persistent_fork_leaves_the_original_alone(seed):
+    em = PersistentEntityManager()
+    created = apply_random_ops([em], seed, steps=150)
+    before = observe(em, created)
+    fork = em.fork()
+    apply_random_ops([fork], seed + 100, steps=150, created=list(created))
+    assert observe(em, created) == before
+    # And the other way round
+    forked = observe(fork, created)
+    apply_random_ops([em], seed + 200, steps=150, created=list(created))
+    assert observe(fork, created) == forked
+
+
+@pytest.mark.parametrize('name', ['demo', 'switch-trick-world', 'door', 'snake', 'chase-push'])
+def test_world_steps_the_same_on_persistent_storage(name):
+    world = gridlab.create_world(name)
+    persistent_world = with_entity_manager(name, PersistentEntityManager)
+    branches = []
+    for action in random_actions(10, 40):
+        branches.append((world.fork(), persistent_world.fork()))
+        world.step(action=action)
+        persistent_world.step(action=action)
+        assert snapshot(persistent_world) == snapshot(world)
+
+    for plain, persistent in branches[::5]:
+        for action in random_actions(11, 10):
+            plain.step(action=action)
+            persistent.step(action=action)
+
+        assert snapshot(persistent) == snapshot(plain)
+
+
+def test_handles_detect_removal_and_reuse():
+    em = EntityManager(recycle_ids=True)
+    a, b, c = em.create(), em.create(), em.create()
+    handle = em.handle(b)
+    assert em.resolve(handle) == b
+    em.remove(c)
+    em.remove(b)
+    assert em.resolve(handle) is None
+    assert em.create() == b  # lowest free id first
+    assert em.resolve(handle) is None
+    assert em.resolve(em.handle(b)) == b
+    assert em.create() == c and em.create() == 3
+    assert em.resolve(em.handle(a)) == a
+
+
+def test_ids_are_not_reused_by_default():
+    em = EntityManager()
+    em.create()
+    em.remove(em.create())
+    assert em.create() == 2
+
+
+def test_rollback_restores_recycled_ids():
+    em = EntityManager(recycle_ids=True)
+    a, b, c = em.create(), em.create(), em.create()
+    stale = em.handle(b)
+    em.remove(b)
+    em.start_journal()
+    mark = em.journal_mark()
+    assert em.create() == b
+    em.remove(a)
+    assert em.create() == a
+    em.rollback(mark)
+
+    assert em.is_alive(a) and not em.is_alive(b) and em.is_alive(c)
+    assert em.resolve(stale) is None
+    assert em.resolve(em.handle(a)) == a
+    assert em.create() == b and em.create() == 3
+
+
+@pytest.mark.parametrize('recycle_ids', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_rollback_of_random_ops_matches_a_fork(recycle_ids, seed):
+    em = EntityManager(recycle_ids=recycle_ids)
+    created = apply_random_ops([em], seed, steps=150)
+    alive = [e for e in created if em.is_alive(e)]
+    handles = [em.handle(e) for e in alive]
+    reference = em.fork()
+    em.start_journal()
+    mark = em.journal_mark()
+    apply_random_ops([em], seed + 100, steps=150, created=list(created))
+    em.rollback(mark)
+
+    assert observe(em, created) == observe(reference, created)
+    assert [em.resolve(h) for h in handles] == alive
+    # Ids and generations are restored too, so both hand out the same ids from here
+    apply_random_ops([em, reference], seed + 200, steps=150, created=list(created))
@@ -0,0 +1,33 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import gridlab
+from gridlab.component import Active, Identity, Position
+from gridlab.env import WorldEnv
+from gridlab.view.grid import ENTITY_CODES
+
+from conftest import random_actions
+
+
+def expected_observation(env):
+    em = env.world.em
+    observation = np.zeros(env.observation_shape, dtype='uint8')
+    for ent in em.query(Identity, Position, Active):
+        p = em.get(Position)[ent]
+        observation[ENTITY_CODES[em.get(Identity)[ent].type], p.y, p.x] = 1
+
+    return observation
+
+
+@pytest.mark.parametrize('name', ['demo', 'door', 'timer', 'switch-trick-world', 'snake', 'chase-push'])
+def test_observation_tracks_the_world(name):
+    env = WorldEnv(name)
+    for seed in range(3):
+        observation, _ = env.reset()
+        assert (observation == expected_observation(env)).all()
+        for action in random_actions(seed, 40):
+            observation, _, terminated, _, _ = env.step(action)
+            assert (observation == expected_observation(env)).all()
+            if terminated:
+                break
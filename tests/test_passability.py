@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+import gridlab
+from gridlab.component import Active, Position, Solid
+from gridlab.entity import EntityManager
+from gridlab.grid import Grid
+from gridlab.passability import PassabilityMap
+
+from conftest import random_actions
+
+GRID = Grid(4, 3)
+
+
+def cells(passability: PassabilityMap) -> list[bool]:
+    return [passability.is_passable(x, y) for y in range(passability.height) for x in range(passability.width)]
+
+
+def rebuilt(passability: PassabilityMap) -> list[bool]:
+    """Cells of a map scanned from scratch, unregistered again so it doesn't follow later changes."""
+    fresh = PassabilityMap(passability.em, Grid(passability.width, passability.height))
+    passability.em.component_callbacks.remove(fresh.on_component_changed)
+    return cells(fresh)
+
+
+def random_position(rng: random.Random) -> Position:
+    return Position(rng.randrange(GRID.width), rng.randrange(GRID.height))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_ops_match_a_rebuilt_map(seed):
+    rng = random.Random(seed)
+    em = EntityManager()
+    passability = PassabilityMap(em, GRID)
+    changes = []
+    passability.cell_callbacks.append(lambda x, y, passable: changes.append((x, y, passable)))
+    created = []
+    for _ in range(400):
+        before = cells(passability)
+        alive = [e for e in created if em.is_alive(e)]
+        op = rng.random()
+        if op < 0.15 or not alive:
+            created.append(em.create())
+        elif op < 0.25:
+            em.remove(rng.choice(alive))
+        elif op < 0.75:
+            em.add_component(rng.choice(alive), rng.choice((random_position(rng), Active(), Solid())))
+        else:
+            ent = rng.choice(alive)
+            held = [t for t in (Position, Active, Solid) if ent in em.get(t)]
+            if held:
+                em.remove_component(ent, rng.choice(held))
+
+        after = cells(passability)
+        assert after == rebuilt(passability)
+        # Only cells that flipped are reported, once each
+        flipped = [(i % GRID.width, i // GRID.width, a) for i, (b, a) in enumerate(zip(before, after)) if a != b]
+        assert sorted(changes) == sorted(flipped)
+        changes.clear()
+
+
+def test_rows_and_cells_are_live_views():
+    em = EntityManager()
+    passability = PassabilityMap(em, GRID)
+    rows, flat = passability.rows, passability.cells
+    e = em.create()
+    em.add_component(e, Position(2, 1))
+    em.add_component(e, Solid())
+    assert rows[1][2] and flat[GRID.width + 2]
+    em.add_component(e, Active())
+    assert not rows[1][2] and not flat[GRID.width + 2]
+    em.add_component(e, Position(3, 2))
+    assert rows[1][2] and not rows[2][3]
+    with pytest.raises(TypeError):
+        rows[0][0] = 0
+
+
+@pytest.mark.parametrize('name', ['demo', 'door', 'switch', 'chase', 'snake'])
+def test_world_steps_keep_the_map_in_sync(name):
+    world = gridlab.create_world(name)
+    fork = None
+    for i, action in enumerate(random_actions(3, 60)):
+        if i == 20:
+            fork = world.fork()
+
+        for w in filter(None, (world, fork)):
+            w.step(action=action)
+            assert cells(w.passability) == rebuilt(w.passability)
+
+        if world.state.is_finished:
+            break
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from gridlab.persistent import PersistentMap
+
+
+class Colliding:
+    """Key whose hash is the same for every instance."""
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __hash__(self):
+        return 42
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and other.value == self.value
+
+
+# Small ints, keys sharing every hash bit, and ints sharing their low 40 bits (so deep paths)
+KEYS = [*range(200), *(Colliding(i) for i in range(5)), *(i << 40 for i in range(1, 20))]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_dict(seed):
+    rng = random.Random(seed)
+    persistent, expected = PersistentMap(), {}
+    copies = []
+    for step in range(3000):
+        key = rng.choice(KEYS)
+        if rng.random() < 0.6:
+            persistent[key] = expected[key] = step
+        elif key in expected:
+            del persistent[key]
+            del expected[key]
+        else:
+            with pytest.raises(KeyError):
+                del persistent[key]
+
+        assert len(persistent) == len(expected)
+        assert (key in persistent) == (key in expected)
+        assert persistent.get(key) == expected.get(key)
+        if step % 200 == 0:
+            copies.append((persistent.copy(), dict(expected)))
+
+    assert dict(persistent.items()) == expected
+    assert sorted(persistent.values()) == sorted(expected.values())
+    # Copies share structure with the map, but see none of the writes made after them
+    for copied, contents in copies:
+        assert dict(copied.items()) == contents and len(copied) == len(contents)
+
+
+def test_clear_leaves_copies_alone():
+    persistent = PersistentMap()
+    for key in KEYS:
+        persistent[key] = key
+
+    copied = persistent.copy()
+    persistent.clear()
+    assert not persistent and len(copied) == len(KEYS)
+    assert all(copied[key] is key for key in KEYS)
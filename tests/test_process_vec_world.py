@@ -0,0 +1,93 @@
+import pytest
+
+import gridlab
+from gridlab.action import Action
+from gridlab.env import get_reward
+from gridlab.view.grid import write_entity_codes
+
+from conftest import random_actions
+
+WORLDS = ['demo', 'door', 'chase', 'spike']
+N = 4
+
+
+def codes(world) -> bytes:
+    out = bytearray(world.grid.width * world.grid.height)
+    write_entity_codes(world, out)
+    return bytes(out)
+
+
+def observation(vec, i: int) -> bytes:
+    size = vec.width * vec.height
+    return vec.observations.tobytes()[i * size:(i + 1) * size]
+
+
+def rollouts(n: int, steps: int) -> list[list[Action]]:
+    """Per step, one action per world."""
+    per_world = [random_actions(seed, steps) for seed in range(n)]
+    return [list(actions) for actions in zip(*per_world)]
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_matches_scalar_worlds(name):
+    worlds = [gridlab.create_world(name) for _ in range(N)]
+    with gridlab.ProcessVecWorld(name, N, num_workers=2, auto_reset=False) as vec:
+        assert [observation(vec, i) for i in range(N)] == [codes(world) for world in worlds]
+        for actions in rollouts(N, 40):
+            was_finished = [world.state.is_finished for world in worlds]
+            _, rewards, dones = vec.step(actions)
+            for i, (world, action) in enumerate(zip(worlds, actions)):
+                world.step(action=action)
+                # A finished world reports its reward and done once, on the step that finished it
+                stepped = not was_finished[i]
+                assert rewards[i] == (get_reward(world.state) if stepped else 0.0)
+                assert dones[i] == (world.state.is_finished and stepped)
+                assert observation(vec, i) == codes(world)
+
+
+def test_step_async_matches_step():
+    with (
+        gridlab.ProcessVecWorld('demo', N, num_workers=2) as stepped,
+        gridlab.ProcessVecWorld('demo', N, num_workers=2) as started,
+    ):
+        for actions in rollouts(N, 20):
+            stepped.step(actions)
+            started.step_async(actions)
+            with pytest.raises(ValueError):
+                started.step_async(actions)
+
+            started.step_wait()
+            assert started.observations.tobytes() == stepped.observations.tobytes()
+            assert list(started.rewards) == list(stepped.rewards)
+            assert list(started.dones) == list(stepped.dones)
+
+        with pytest.raises(ValueError):
+            started.step_wait()
+
+
+def test_auto_reset_starts_the_next_episode():
+    world = gridlab.create_world('demo')
+    fresh = codes(world)
+    solution = world.solve()
+    world.step_many(solution)
+    with gridlab.ProcessVecWorld('demo', 2, num_workers=1) as vec:
+        for action in solution:
+            _, rewards, dones = vec.step([action, Action.NONE])
+
+        assert list(dones) == [True, False] and list(rewards) == [get_reward(world.state), 0.0]
+        assert observation(vec, 0) == fresh
+        vec.step([Action.NONE, Action.NONE])
+        assert list(rewards) == [0.0, 0.0] and not any(dones)
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_dones_match_vec_world(name):
+    np = pytest.importorskip('numpy')
+    actions = rollouts(N, 40)
+    vec = gridlab.VecWorld(name, N, auto_reset=False)
+    with gridlab.ProcessVecWorld(name, N, num_workers=2, auto_reset=False) as process_vec:
+        for step_actions in actions:
+            goal_reached, player_dead = vec.step(step_actions)
+            _, rewards, dones = process_vec.step(step_actions)
+            assert list(dones) == list(goal_reached | player_dead)
+            assert np.array_equal(np.asarray(rewards) != 0, goal_reached | player_dead)
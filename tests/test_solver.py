@@ -0,0 +1,113 @@
+import pytest
+
+import gridlab
+from gridlab.external_solver import reachable_states, solve_external
+from gridlab.parallel_solver import solve_parallel
+from gridlab.solver import ACTIONS, SearchMethod, fingerprint, solve
+from gridlab.verify import NO_SOLUTION, VerificationFailed, verify_solution
+
+WORLDS = ['empty', 'demo', 'mirror-block', 'switch', 'snake', 'chase-push', 'blockade']
+
+
+def assert_solves(name, actions, length):
+    assert actions is not None and len(actions) == length
+    rollout = gridlab.create_world(name).step_many(actions)
+    assert rollout.goal_reached and rollout.steps == length
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_solvers_agree_on_shortest_length(name):
+    a_star = solve(gridlab.create_world(name))
+    bfs = solve(gridlab.create_world(name), method=SearchMethod.BFS)
+    length = len(a_star.actions)
+    assert_solves(name, a_star.actions, length)
+    assert_solves(name, bfs.actions, length)
+    assert_solves(name, solve_external(gridlab.create_world(name), buffer_size=64).actions, length)
+    assert_solves(name, solve_parallel(name, num_workers=2).actions, length)
+
+
+def test_unsolvable_world_is_exhausted():
+    for result in (
+            solve(gridlab.create_world('chase-test')),
+            solve_external(gridlab.create_world('chase-test')),
+            solve_parallel('chase-test', num_workers=2),
+    ):
+        assert result.actions is None and result.exhausted
+
+
+def test_world_without_goal():
+    result = solve(gridlab.create_world('demo2'))
+    assert result.actions is None and result.exhausted
+    with pytest.raises(gridlab.UnsolvableError):
+        gridlab.create_world('demo2').solve()
+
+    with pytest.raises(VerificationFailed) as failed:
+        verify_solution('demo2')
+
+    assert failed.value.status == NO_SOLUTION
+
+
+def test_solve_is_cached_per_state(monkeypatch):
+    world = gridlab.create_world('blockade')
+    assert gridlab.world_metadata(world)['solution_length'] is None  # metadata never searches
+
+    solution = world.solve()
+    assert gridlab.world_metadata(world)['solution_length'] == len(solution)
+
+    monkeypatch.setattr(gridlab.solver, 'solve', None)
+    assert world.fork().solve() == solution
+
+
+def test_node_budget():
+    result = solve(gridlab.create_world('switch-push'), max_nodes=10)
+    assert result.actions is None and not result.exhausted
+
+
+@pytest.mark.parametrize('num_workers', [1, 3])
+def test_parallel_node_budget_is_shared(num_workers):
+    result = solve_parallel('switch-push', num_workers=num_workers, max_nodes=10)
+    assert result.actions is None and not result.exhausted
+    assert result.nodes <= 10
+
+
+def test_reachable_states_counts_each_state_once():
+    layers = reachable_states(gridlab.create_world('switch'), buffer_size=16)
+    assert layers[0] == 1
+    assert all(layers)
+    assert sum(layers) == sum(reachable_states(gridlab.create_world('switch'), buffer_size=1 << 16))
+
+
+def breadth_first_layers(world, max_depth: int) -> list[int]:
+    """New states after each number of steps, kept in memory."""
+    root = world.fork()
+    root.enable_undo()
+    seen = {fingerprint(root)}
+    layer = [root.encode()]
+    sizes = [1]
+    for _ in range(max_depth):
+        next_layer = []
+        for encoded in layer:
+            node = root.fork()
+            node.decode(encoded)
+            for action in ACTIONS:
+                node.step(action=action)
+                if not node.state.goal_reached and not node.state.player_dead and fingerprint(node) not in seen:
+                    seen.add(fingerprint(node))
+                    next_layer.append(node.encode())
+
+                node.undo()
+
+        sizes.append(len(next_layer))
+        layer = next_layer
+
+    while sizes and not sizes[-1]:
+        sizes.pop()
+
+    return sizes
+
+
+@pytest.mark.parametrize('name', ['demo', 'switch-trick-world', 'chase-push'])
+def test_reachable_states_match_breadth_first_search(name):
+    # A buffer of 4 spills nearly every bucket and merges many visited runs
+    layers = reachable_states(gridlab.create_world(name), max_depth=12, buffer_size=4)
+    assert layers == breadth_first_layers(gridlab.create_world(name), 12)
@@ -0,0 +1,90 @@
+import pytest
+
+import gridlab
+from gridlab.component import KeyCollector
+from gridlab.entity import Entity
+from gridlab.solver import fingerprint
+
+from conftest import random_actions
+
+
+@pytest.mark.parametrize('name', gridlab.world_names())
+def test_round_trip(name):
+    world = gridlab.create_world(name)
+    for seed in range(5):
+        walker = world.fork()
+        for action in random_actions(seed, 40):
+            walker.step(action=action)
+            if walker.state.is_finished:
+                break
+
+            data = walker.encode()
+            assert len(data) == world.state_codec.size
+            decoded = world.fork()
+            decoded.decode(data)
+            assert decoded.encode() == data
+            assert fingerprint(decoded) == fingerprint(walker)
+
+
+@pytest.mark.parametrize('name', ['demo', 'snake', 'switch-trick-world', 'patrol-advanced'])
+def test_decoded_world_steps_like_the_original(name):
+    world = gridlab.create_world(name)
+    original = world.fork()
+    for action in random_actions(7, 12):
+        original.step(action=action)
+
+    decoded = world.fork()
+    decoded.decode(original.encode())
+    for action in random_actions(8, 20):
+        original.step(action=action)
+        decoded.step(action=action)
+        assert decoded.encode() == original.encode()
+
+
+def test_encoding_is_canonical():
+    a = gridlab.create_world('demo')
+    b = gridlab.create_world('demo')
+    for action in ['up', 'down', 'right', 'left']:
+        a.step(action=action)
+
+    assert a.encode() != b.encode()
+    b.step(action='none')
+    b.step(action='none')
+    a_fork = a.fork()
+    assert a_fork.encode() == a.encode()
+
+
+class TwoDoorWorld(gridlab.World):
+    name = 'two-door'
+    entity_types = [Entity.PLAYER, Entity.GOAL, Entity.WALL, Entity.KEY, Entity.DOOR]
+
+    def build(self):
+        self.populate(
+            text="""
+            ######
+            #@K+X#
+            ##+..#
+            ######
+            """,
+            initializers={'.': None, '#': self.add_wall, '@': self.add_player, 'X': self.add_goal,
+                          'K': self.add_key, '+': self.add_door},
+        )
+
+
+def test_round_trip_with_negative_key_count():
+    world = TwoDoorWorld()
+    walker = world.fork()
+    walker.step(action='right')  # the key opens both doors next to it
+    assert walker.em.get(KeyCollector)[walker.player].count == -1
+
+    decoded = world.fork()
+    decoded.decode(walker.encode())
+    assert decoded.em.get(KeyCollector)[decoded.player].count == -1
+    assert decoded.encode() == walker.encode()
+
+
+def test_counter_out_of_range():
+    world = TwoDoorWorld()
+    world.em.get(KeyCollector)[world.player].count = 1 << 15
+    with pytest.raises(ValueError):
+        world.encode()
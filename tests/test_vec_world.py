@@ -0,0 +1,28 @@
+import pytest
+
+import gridlab
+from gridlab.action import Action
+
+from conftest import snapshot
+
+np = pytest.importorskip('numpy')
+
+ACTIONS = list(Action)
+
+
+@pytest.mark.parametrize('name', gridlab.world_names())
+def test_matches_scalar_worlds(name):
+    n = 6
+    vec = gridlab.VecWorld(name, n, auto_reset=False)
+    worlds = [gridlab.create_world(name) for _ in range(n)]
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        actions = rng.integers(0, len(ACTIONS), n)
+        was_finished = [world.state.is_finished for world in worlds]
+        goal_reached, player_dead = vec.step(actions)
+        for i, world in enumerate(worlds):
+            world.step(action=ACTIONS[actions[i]])
+            assert snapshot(vec.world(i)) == snapshot(world)
+            # The flags returned are those set by this step
+            assert goal_reached[i] == (world.state.goal_reached and not was_finished[i])
+            assert player_dead[i] == (world.state.player_dead and not was_finished[i])
@@ -0,0 +1,63 @@
+import pytest
+
+import gridlab
+from gridlab.entity import Entity
+from gridlab.view.grid import ENTITY_CODES, TextGridView, write_entity_codes, write_entity_codes_batch
+from gridlab.view.theme import ASCII
+
+from conftest import random_actions
+
+
+def drawn_codes(world) -> bytes:
+    """Entity codes of the cells as TextGridView draws them."""
+    grid = TextGridView().entity_symbol_grid(world, ASCII())
+    return bytes(ENTITY_CODES[entity_type] for row in grid for entity_type, _ in row)
+
+
+def written_codes(world) -> bytes:
+    out = bytearray(world.grid.width * world.grid.height)
+    write_entity_codes(world, out)
+    return bytes(out)
+
+
+@pytest.mark.parametrize('name', gridlab.world_names())
+def test_entity_codes_match_text_grid_view(name):
+    world = gridlab.create_world(name)
+    assert written_codes(world) == drawn_codes(world)
+    for action in random_actions(12, 40):
+        world.step(action=action)
+        assert written_codes(world) == drawn_codes(world)
+        if world.state.is_finished:
+            break
+
+
+def test_entity_codes_are_written_at_offset():
+    world = gridlab.create_world('demo')
+    size = world.grid.width * world.grid.height
+    out = bytearray(b'\xff' * (size + 3))
+    write_entity_codes(world, out, 2)
+    assert out[:2] == b'\xff\xff' and out[-1:] == b'\xff'
+    assert bytes(out[2:2 + size]) == drawn_codes(world)
+    assert ENTITY_CODES[Entity.PLAYER] in out
+
+    with pytest.raises(ValueError):
+        write_entity_codes(world, out, 4)
+
+
+def test_batch_matches_single_worlds():
+    worlds = [gridlab.create_world('demo') for _ in range(3)]
+    for i, world in enumerate(worlds):
+        world.step_many(random_actions(i, 5 * i))
+
+    size = worlds[0].grid.width * worlds[0].grid.height
+    out = bytearray(len(worlds) * size)
+    write_entity_codes_batch(worlds, out)
+    assert bytes(out) == b''.join(drawn_codes(world) for world in worlds)
+
+    with pytest.raises(ValueError):
+        write_entity_codes_batch(worlds, bytearray(size))
+
+    other = gridlab.create_world('empty')
+    if other.grid.width * other.grid.height != size:
+        with pytest.raises(ValueError):
+            write_entity_codes_batch([worlds[0], other], bytearray(2 * max(size, other.grid.width * other.grid.height)))
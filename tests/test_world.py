@@ -0,0 +1,143 @@
+import pytest
+
+import gridlab
+from gridlab.pathfinding import Pathfinding
+from gridlab.world import StepRecord
+from gridlab.zobrist import ZobristHash
+from gridlab import component, system
+
+from conftest import random_actions, snapshot
+
+WORLDS = ['demo', 'switch-trick-world', 'door', 'timer', 'patrol-advanced', 'snake', 'chase-push']
+
+
+def replay(name, actions):
+    world = gridlab.create_world(name)
+    for action in actions:
+        world.step(action=action)
+
+    return world
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_fork_is_isolated(name):
+    pre, post1, post2 = random_actions(1, 15), random_actions(2, 20), random_actions(3, 20)
+    world = replay(name, pre)
+    fork = world.fork()
+    for action in post2:
+        fork.step(action=action)
+
+    for action in post1:
+        world.step(action=action)
+
+    assert snapshot(world) == snapshot(replay(name, pre + post1))
+    assert snapshot(fork) == snapshot(replay(name, pre + post2))
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_undo_restores_earlier_states(name):
+    world = gridlab.create_world(name)
+    world.enable_undo()
+    actions = random_actions(4, 30)
+    snapshots = [snapshot(world)]
+    for action in actions:
+        if world.state.is_finished:
+            break  # steps on a finished world change nothing and record nothing
+
+        world.step(action=action)
+        snapshots.append(snapshot(world))
+
+    while len(snapshots) > 1:
+        snapshots.pop()
+        assert world.undo()
+        assert snapshot(world) == snapshots[-1]
+
+    assert not world.undo()
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_state_hash_matches_fresh_hash(name):
+    world = gridlab.create_world(name)
+    hashes = {world.state_hash}
+    for action in random_actions(5, 25):
+        world.step(action=action)
+        fresh = ZobristHash(world.em, mutable=component.MUTABLE_COMPONENTS)
+        assert fresh.value == world.state_hash
+        fresh.close()
+        hashes.add(world.state_hash)
+
+    assert len(hashes) > 1
+
+
+@pytest.mark.parametrize('name', WORLDS)
+def test_transition_cache_replays_the_same_states(name):
+    world = gridlab.create_world(name)
+    cache = world.enable_transition_cache()
+    actions = random_actions(6, 25)
+    first = world.fork()
+    for action in actions:
+        first.step(action=action)
+
+    misses = cache.misses
+    replayed = world.fork()
+    plain = gridlab.create_world(name)
+    for action in actions:
+        replayed.step(action=action)
+        plain.step(action=action)
+        assert replayed.state_hash == plain.state_hash
+        assert replayed.state.get_flags() == plain.state.get_flags()
+
+    assert cache.misses == misses and cache.hits > 0
+
+
+def test_step_many_stops_when_finished():
+    world = gridlab.create_world('demo')
+    solution = world.solve()
+    rollout = world.step_many([*solution, 'up', 'up'], record=StepRecord.HASH)
+    assert rollout.steps == len(solution)
+    assert rollout.goal_reached and not rollout.player_dead
+    assert rollout.records[-1] == world.state_hash
+
+
+@pytest.mark.parametrize('name, system_type', [
+    ('door', system.DoorSystem),
+    ('timer', system.TimerSystem),
+    ('switch', system.SwitchSystem),
+])
+def test_schedule_skips_systems_without_their_components(name, system_type):
+    def scheduled(world):
+        world.compile_schedule()
+        return {type(s) for s, enabled in zip(world.systems, world._schedule) if enabled}
+
+    assert system_type in scheduled(gridlab.create_world(name))
+    assert system_type not in scheduled(gridlab.create_world('empty'))
+
+def test_undo_after_finished_step_reverts_the_last_real_step():
+    world = gridlab.create_world('demo')
+    world.enable_undo()
+    rollout = world.step_many(world.solve())
+    assert rollout.goal_reached
+
+    before = snapshot(world)
+    world.step(action='none')
+    assert snapshot(world) == before
+    assert world.undo()
+    assert not world.state.goal_reached
+
+
+@pytest.mark.parametrize('pathfinding', [Pathfinding.FLOW_FIELD, Pathfinding.INCREMENTAL])
+@pytest.mark.parametrize('name', ['demo', 'snake', 'chase', 'chase-test'])
+def test_pathfinding_modes_take_the_a_star_path(name, pathfinding):
+    def positions(world):
+        return sorted((ent, p.x, p.y) for ent, p in world.em.get(component.Position).items())
+
+    world = gridlab.create_world(name)
+    other = gridlab.create_world(name)
+    for component_type in (component.ChaseAI, component.SnakeAI):
+        for ai in other.em.get(component_type).values():
+            ai.pathfinding = pathfinding
+
+    for action in random_actions(8, 40):
+        world.step(action=action)
+        other.step(action=action)
+        assert positions(other) == positions(world)